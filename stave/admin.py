@@ -53,7 +53,22 @@ class MessageTemplateAdmin(admin.ModelAdmin):
 
 @admin.register(models.Message)
 class MessageAdmin(admin.ModelAdmin):
-    list_display = ("id", "sent_date", "sent", "reply_to", "user", "subject")
+    list_display = (
+        "id",
+        "created_at",
+        "priority",
+        "sent_date",
+        "sent",
+        "reply_to",
+        "user",
+        "subject",
+    )
+
+
+@admin.register(models.EmailSuppression)
+class EmailSuppressionAdmin(admin.ModelAdmin):
+    list_display = ("email", "reason", "created_at")
+    search_fields = ("email",)
 
 
 class ApplicationResponseInline(admin.TabularInline):
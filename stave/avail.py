@@ -36,6 +36,56 @@ class UserAvailabilityEntry:
                 return True
 
 
+@dataclass(frozen=True, order=True)
+class ScheduleEntry:
+    """One effective assignment on a user's schedule, in a form that can be
+    stored on a ScheduleSnapshot and compared later."""
+
+    # Sorts event-wide assignments (no start time) first, then by time.
+    start_time: str
+    context: str
+    role: str
+    key: str
+
+    def to_json(self) -> dict[str, str]:
+        return {
+            "key": self.key,
+            "context": self.context,
+            "role": self.role,
+            "start_time": self.start_time,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, str]) -> "ScheduleEntry":
+        return cls(
+            key=data["key"],
+            context=data["context"],
+            role=data["role"],
+            start_time=data["start_time"],
+        )
+
+
+@dataclass
+class ScheduleChanges:
+    added: list[ScheduleEntry]
+    removed: list[ScheduleEntry]
+
+    @classmethod
+    def between(
+        klass, old: Iterable[ScheduleEntry], new: Iterable[ScheduleEntry]
+    ) -> "ScheduleChanges":
+        # A changed game time or name shows up as one removal and one addition.
+        old_entries = set(old)
+        new_entries = set(new)
+        return klass(
+            added=sorted(new_entries - old_entries),
+            removed=sorted(old_entries - new_entries),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
 class ScheduleManager:
     event: models.Event
 
@@ -107,19 +157,52 @@ class ScheduleManager:
             if crew.kind == models.CrewKind.EVENT_CREW
         ]
 
+    def entries_by_user(self) -> dict[UUID, list[ScheduleEntry]]:
+        """Each user's effective assignments: Event Crews, plus the Game Crew or
+        override for each game. Uses only the prefetched data."""
+        entries: dict[UUID, list[ScheduleEntry]] = defaultdict(list)
+
+        for crew in self.event_crews:
+            for assignment in crew.assignments.all():
+                entries[assignment.user_id].append(
+                    ScheduleEntry(
+                        key=f"{crew.id}:{assignment.role_id}",
+                        context=self.event.name,
+                        role=assignment.role.name,
+                        start_time="",
+                    )
+                )
+
+        for game in self.event.games.all():
+            for rgca in game.role_group_crew_assignments.all():
+                for assignment in rgca.effective_crew():
+                    entries[assignment.user_id].append(
+                        ScheduleEntry(
+                            key=f"{game.id}:{assignment.role_id}",
+                            context=game.name,
+                            role=assignment.role.name,
+                            start_time=game.start_time.isoformat(),
+                        )
+                    )
+
+        return {
+            user_id: sorted(user_entries) for user_id, user_entries in entries.items()
+        }
+
 
 class AvailabilityManager:
     application_form: models.ApplicationForm
 
     @classmethod
     def with_application_form(
-        klass, application_form: models.ApplicationForm
+        klass,
+        application_form: models.ApplicationForm,
+        prefetch_applications: bool = True,
     ) -> "AvailabilityManager":
-        application_form: models.ApplicationForm = (
-            models.ApplicationForm.objects.filter(id=application_form.id)
-            .prefetch_related(
-                "role_groups",
-                "role_groups__roles",
+        """Load the form's crews and games. Callers that only need
+        assignment data, not `applications`, can skip prefetching them."""
+        application_prefetches = (
+            [
                 Prefetch("applications"),
                 Prefetch(
                     "applications__roles",
@@ -128,6 +211,16 @@ class AvailabilityManager:
                 Prefetch(
                     "applications__availability_by_game",
                 ),
+            ]
+            if prefetch_applications
+            else []
+        )
+        application_form: models.ApplicationForm = (
+            models.ApplicationForm.objects.filter(id=application_form.id)
+            .prefetch_related(
+                "role_groups",
+                "role_groups__roles",
+                *application_prefetches,
                 Prefetch(
                     "event__games",
                     queryset=models.Game.objects.filter(
@@ -390,3 +483,61 @@ class AvailabilityManager:
                 applications,
             )
         )
+
+
+def current_schedules(
+    application_form: models.ApplicationForm,
+) -> dict[UUID, list[ScheduleEntry]]:
+    return ScheduleManager(
+        application_form.event, application_form.role_groups.all()
+    ).entries_by_user()
+
+
+def schedule_changes(
+    application_form: models.ApplicationForm,
+    applications: Iterable[models.Application],
+    schedules: dict[UUID, list[ScheduleEntry]] | None = None,
+) -> dict[UUID, ScheduleChanges]:
+    """Changes since each application's last schedule email, by application id.
+    Applications without a snapshot compare against an empty schedule."""
+    applications = list(applications)
+    if not applications:
+        return {}
+    if schedules is None:
+        schedules = current_schedules(application_form)
+
+    snapshots = dict(
+        models.ScheduleSnapshot.objects.filter(
+            application__in=applications
+        ).values_list("application_id", "entries")
+    )
+    return {
+        application.id: ScheduleChanges.between(
+            (
+                ScheduleEntry.from_json(entry)
+                for entry in snapshots.get(application.id, [])
+            ),
+            schedules.get(application.user_id, []),
+        )
+        for application in applications
+    }
+
+
+def record_schedule_snapshots(
+    applications: Iterable[models.Application],
+    schedules: dict[UUID, list[ScheduleEntry]],
+):
+    models.ScheduleSnapshot.objects.bulk_create(
+        [
+            models.ScheduleSnapshot(
+                application=application,
+                entries=[
+                    entry.to_json() for entry in schedules.get(application.user_id, [])
+                ],
+            )
+            for application in applications
+        ],
+        update_conflicts=True,
+        unique_fields=["application"],
+        update_fields=["entries", "sent_at"],
+    )
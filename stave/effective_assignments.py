@@ -0,0 +1,79 @@
+"""The database view behind models.EffectiveAssignment.
+
+It has one row per role of each Game's role group crew assignment: the
+override crew's assignment for that role if it has one, otherwise the static
+crew's. It's a plain view, so it's always current. Lookups through it by user
+or by game use the indexes on the crew tables: CrewAssignment's (user, crew)
+and (crew, role), and RoleGroupCrewAssignment's foreign keys.
+
+A view pins the columns it reads, so altering stave_crewassignment or
+stave_rolegroupcrewassignment fails while it exists. It's dropped before
+migrations run and recreated once they've finished (see signals.py)."""
+
+VIEW = "stave_effectiveassignment"
+
+# The id is unique because a crew has at most one assignment per role.
+SELECT = """
+SELECT {text_rgca_id} || ':' || {text_role_id} AS id,
+       rgca.id AS role_group_crew_assignment_id,
+       rgca.game_id,
+       rgca.role_group_id,
+       ca.role_id,
+       ca.user_id,
+       ca.id AS crew_assignment_id,
+       {true} AS is_override
+  FROM stave_rolegroupcrewassignment rgca
+  JOIN stave_crewassignment ca ON ca.crew_id = rgca.crew_overrides_id
+UNION ALL
+SELECT {text_rgca_id} || ':' || {text_role_id},
+       rgca.id,
+       rgca.game_id,
+       rgca.role_group_id,
+       ca.role_id,
+       ca.user_id,
+       ca.id,
+       {false}
+  FROM stave_rolegroupcrewassignment rgca
+  JOIN stave_crewassignment ca ON ca.crew_id = rgca.crew_id
+ WHERE NOT EXISTS (
+       SELECT 1
+         FROM stave_crewassignment o
+        WHERE o.crew_id = rgca.crew_overrides_id
+          AND o.role_id = ca.role_id
+       )
+"""
+
+
+def create_view(connection):
+    drop_view(connection)
+    if connection.vendor == "postgresql":
+        select = SELECT.format(
+            text_rgca_id="rgca.id::text",
+            text_role_id="ca.role_id::text",
+            true="TRUE",
+            false="FALSE",
+        )
+    else:
+        select = SELECT.format(
+            text_rgca_id="rgca.id",
+            text_role_id="ca.role_id",
+            true="1",
+            false="0",
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE VIEW {VIEW} AS {select}")
+
+
+def drop_view(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # It used to be materialized on PostgreSQL, which DROP VIEW refuses.
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [VIEW]
+            )
+            if cursor.fetchone() == ("m",):
+                cursor.execute(f"DROP MATERIALIZED VIEW {VIEW}")
+                return
+
+        cursor.execute(f"DROP VIEW IF EXISTS {VIEW}")
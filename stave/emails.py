@@ -1,39 +1,258 @@
 from abc import ABC
-from datetime import datetime, timedelta, timezone
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+from functools import lru_cache
+import dataclasses
+import enum
+import html
 import re
+import uuid
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
 
-from django.db.models import QuerySet
+import bleach
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet, prefetch_related_objects
 from django.urls import reverse_lazy, reverse
-from django.utils.translation import gettext
+from django.utils import formats, translation
+from django.utils.translation import gettext, ngettext
 from markdownify.templatetags.markdownify import markdownify
 
-from . import models
+from . import avail, models
 
 FOOTER_MD = f"""
 
 --<br>
 Sent by [Stave](https://stave.app{reverse_lazy("home")}) in response to your application | [Manage Your Account](https://stave.app{reverse_lazy("profile")})
 """
+SUBSCRIPTION_FOOTER_MD = f"""
+
+--<br>
+Sent by [Stave](https://stave.app{reverse_lazy("home")}) because you subscribe to these leagues | [Manage Your Subscriptions](https://stave.app{reverse_lazy("my-subscriptions")})
+"""
 MERGE_FIELD_PATTERN = re.compile(r"\{([a-zA-Z\._]+?)\}")
 MD_LINK_PATTERN = re.compile(r"\[([^\]]+?)\]\(([^)]+?)\)")
 LINE_BREAK_PATTERN = re.compile(r"<br( /)?>")
 
 
+# Merge fields whose entities are shared by every recipient of a send batch.
+BATCH_SCOPED_ENTITIES = {"league", "event", "app_form", "sender"}
+# Merge fields that vary per recipient only by the id of one entity. They're
+# evaluated once against a placeholder id and then patched per recipient,
+# which avoids a reverse() call per recipient.
+ID_SCOPED_FIELDS = {
+    "app_form.schedule_link": "user",
+    "application.link": "application",
+}
+PLACEHOLDER_ID = uuid.UUID(int=0)
+# Merge fields whose values are Markdown, which must be rendered along with the
+# rest of the body rather than escaped into it.
+MARKDOWN_MERGE_FIELDS = {"app_form.intro_text"}
+
+
+class MergeTemplate:
+    """A subject or body split into alternating literal and merge-field segments."""
+
+    def __init__(self, content: str):
+        # re.split() with a capturing group yields [literal, field, literal, ...]
+        self.segments = MERGE_FIELD_PATTERN.split(content)
+
+    @property
+    def fields(self) -> list[str]:
+        return self.segments[1::2]
+
+    def render(self, values: Mapping[str, str | None]) -> str:
+        parts = self.segments[:]
+        for i in range(1, len(parts), 2):
+            # Unknown or empty fields are left in place, as typed.
+            parts[i] = values.get(parts[i]) or f"{{{parts[i]}}}"
+
+        return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_template(content: str) -> MergeTemplate:
+    return MergeTemplate(content)
+
+
+class MergeValueResolver:
+    """Evaluates merge fields for a batch of recipients of the same form.
+
+    Values for the league, event, form and sender are computed for the first
+    context and reused; per-recipient values are computed once per context."""
+
+    def __init__(self, fields: Iterable[str]):
+        self.batch_fields = set()
+        self.id_fields = set()
+        self.recipient_fields = set()
+        for field in fields:
+            if field in ID_SCOPED_FIELDS:
+                self.id_fields.add(field)
+            elif field.split(".")[0] in BATCH_SCOPED_ENTITIES:
+                self.batch_fields.add(field)
+            else:
+                self.recipient_fields.add(field)
+
+        self.batch_values: dict[str, str | None] | None = None
+
+    def _batch_values(self, context: models.MergeContext) -> dict[str, str | None]:
+        values = {
+            field: context.get_merge_field_value(field) for field in self.batch_fields
+        }
+        for field in self.id_fields:
+            entity = ID_SCOPED_FIELDS[field]
+            if obj := getattr(context, entity):
+                values[field] = dataclasses.replace(
+                    context, **{entity: type(obj)(id=PLACEHOLDER_ID)}
+                ).get_merge_field_value(field)
+            else:
+                values[field] = None
+
+        return values
+
+    def resolve(self, context: models.MergeContext) -> dict[str, str | None]:
+        if self.batch_values is None:
+            self.batch_values = self._batch_values(context)
+
+        values = dict(self.batch_values)
+        for field in self.id_fields:
+            obj = getattr(context, ID_SCOPED_FIELDS[field])
+            if values[field] and obj:
+                values[field] = values[field].replace(str(PLACEHOLDER_ID), str(obj.id))
+            else:
+                values[field] = None
+        for field in self.recipient_fields:
+            values[field] = context.get_merge_field_value(field)
+
+        return values
+
+
 def substitute(
     context: models.MergeContext,
     content: str,
 ) -> str:
     # Substitute values for any of the user's tags.
-    return MERGE_FIELD_PATTERN.sub(
-        lambda match: context.get_merge_field_value(match.group(1)) or match.group(),
-        content,
-    )
+    template = compile_template(content)
+    return template.render(MergeValueResolver(template.fields).resolve(context))
 
 
 def render_html(content: str) -> str:
     return markdownify(content)
 
 
+MERGE_TOKEN_PATTERN = re.compile(r"STAVEMERGE(\d+)X")
+
+
+class MergeTokenPosition(enum.Enum):
+    TEXT = enum.auto()
+    LINK_TEXT = enum.auto()
+    ATTRIBUTE = enum.auto()
+
+
+class HtmlMergeTemplate:
+    """A Markdown body rendered to sanitized HTML once, with merge fields
+    substituted (escaped) into the HTML per recipient.
+
+    Merge fields are swapped for inert alphanumeric tokens before rendering.
+    If any token doesn't survive Markdown and sanitizing intact, or a value
+    can't be placed safely, we fall back to rendering the substituted Markdown
+    for that recipient. Bodies that merge Markdown fields are always rendered
+    that way."""
+
+    def __init__(self, content: str):
+        self.template = compile_template(content)
+        self.segments: list[str | tuple[str, MergeTokenPosition]] | None = None
+
+        if any(MERGE_TOKEN_PATTERN.search(s) for s in self.template.segments[::2]):
+            return
+        if MARKDOWN_MERGE_FIELDS.intersection(self.template.fields):
+            return
+
+        source = "".join(
+            segment if i % 2 == 0 else f"STAVEMERGE{i // 2}X"
+            for i, segment in enumerate(self.template.segments)
+        )
+        rendered = render_html(source)
+
+        segments = []
+        seen = []
+        last_end = 0
+        for match in MERGE_TOKEN_PATTERN.finditer(rendered):
+            start = match.start()
+            if rendered.rfind("<", 0, start) > rendered.rfind(">", 0, start):
+                position = MergeTokenPosition.ATTRIBUTE
+            elif rendered.count("<a ", 0, start) > rendered.count("</a>", 0, start):
+                position = MergeTokenPosition.LINK_TEXT
+            else:
+                position = MergeTokenPosition.TEXT
+
+            index = int(match.group(1))
+            seen.append(index)
+            segments.append(rendered[last_end:start])
+            segments.append((self.template.fields[index], position))
+            last_end = match.end()
+        segments.append(rendered[last_end:])
+
+        if seen == list(range(len(self.template.fields))):
+            self.segments = segments
+
+    def render(self, values: Mapping[str, str | None]) -> str:
+        if self.segments is None:
+            return render_html(self.template.render(values))
+
+        parts = self.segments[:]
+        for i in range(1, len(parts), 2):
+            field, position = parts[i]
+            value = values.get(field) or f"{{{field}}}"
+            match position:
+                case MergeTokenPosition.ATTRIBUTE:
+                    if not _is_allowed_url(value):
+                        return render_html(self.template.render(values))
+                    parts[i] = html.escape(value)
+                case MergeTokenPosition.LINK_TEXT:
+                    parts[i] = html.escape(value, quote=False)
+                case MergeTokenPosition.TEXT:
+                    parts[i] = _linkify(html.escape(value, quote=False))
+
+        return "".join(parts)
+
+
+@lru_cache(maxsize=128)
+def compile_html_template(content: str) -> HtmlMergeTemplate:
+    return HtmlMergeTemplate(content)
+
+
+def _markdownify_settings() -> dict:
+    return getattr(settings, "MARKDOWNIFY", {}).get("default", {})
+
+
+def _is_allowed_url(value: str) -> bool:
+    protocols = _markdownify_settings().get(
+        "WHITELIST_PROTOCOLS", bleach.sanitizer.ALLOWED_PROTOCOLS
+    )
+    try:
+        scheme = urlsplit(value).scheme
+    except ValueError:
+        return False
+
+    return not scheme or scheme in protocols
+
+
+def _linkify(escaped_value: str) -> str:
+    # Match the LinkifyFilter markdownify applies to the rest of the body.
+    # Anything linkable has a dot in it, so skip the parse for everything else.
+    linkify_text = _markdownify_settings().get("LINKIFY_TEXT", {"PARSE_URLS": True})
+    if "." not in escaped_value or not linkify_text.get("PARSE_URLS"):
+        return escaped_value
+
+    return bleach.linkifier.Linker(
+        callbacks=linkify_text.get("CALLBACKS", []),
+        skip_tags=linkify_text.get("SKIP_TAGS", []),
+        parse_email=linkify_text.get("PARSE_EMAIL", False),
+    ).linkify(escaped_value)
+
+
 def render_txt(content: str) -> str:
     # Just return the Markdown source, but make the links and line-breaks more usable.
     return MD_LINK_PATTERN.sub(
@@ -45,6 +264,32 @@ def render_txt(content: str) -> str:
     )
 
 
+def render_schedule_changes(changes: avail.ScheduleChanges, time_zone: str) -> str:
+    """A Markdown summary of schedule changes, appended to schedule updates."""
+
+    def line(entry: avail.ScheduleEntry) -> str:
+        if entry.start_time:
+            start_time = formats.localize(
+                datetime.fromisoformat(entry.start_time).astimezone(ZoneInfo(time_zone))
+            )
+            return f"- {entry.context} ({start_time}): {entry.role}"
+
+        return f"- {entry.context}: {entry.role}"
+
+    if not changes:
+        return ""
+
+    sections = [f"**{gettext('Changes to your schedule')}**"]
+    if changes.added:
+        sections.append(gettext("Added:"))
+        sections.append("\n".join(line(entry) for entry in changes.added))
+    if changes.removed:
+        sections.append(gettext("Removed:"))
+        sections.append("\n".join(line(entry) for entry in changes.removed))
+
+    return "\n\n" + "\n\n".join(sections)
+
+
 def send_message_from_messagetemplate(
     application: models.Application,
     sender: models.User | None,
@@ -63,22 +308,36 @@ def send_message_from_messagetemplate(
         )
 
 
-def send_message_with_content(
+def build_message(
     subject: str,
     content: str,
     destination: models.User | str,
     reply_to: str | None = None,
-):
-    models.Message.objects.create(
+    content_html: str | None = None,
+    priority: models.MessagePriority = models.MessagePriority.NORMAL,
+) -> models.Message:
+    return models.Message(
         subject=render_txt(subject),
         content_plain_text=render_txt(content),
-        content_html=render_html(content),
+        content_html=content_html if content_html is not None else render_html(content),
         user=destination if isinstance(destination, models.User) else None,
         email=destination if isinstance(destination, str) else None,
         reply_to=reply_to,
+        language=translation.get_language(),
+        priority=priority,
     )
 
 
+def send_message_with_content(
+    subject: str,
+    content: str,
+    destination: models.User | str,
+    reply_to: str | None = None,
+    priority: models.MessagePriority = models.MessagePriority.NORMAL,
+):
+    build_message(subject, content, destination, reply_to, priority=priority).save()
+
+
 def send_message(
     application: models.Application,
     sender: models.User | None,
@@ -86,6 +345,7 @@ def send_message(
     subject: str,
     content: str,
     reply_to: str | None = None,
+    priority: models.MessagePriority = models.MessagePriority.NORMAL,
 ):
     context = models.MergeContext(
         league=application.form.event.league,
@@ -96,18 +356,24 @@ def send_message(
         sender=sender,
     )
 
-    content = content + FOOTER_MD
+    subject_template = compile_template(subject)
+    content_template = compile_template(content + FOOTER_MD)
+    values = MergeValueResolver(
+        subject_template.fields + content_template.fields
+    ).resolve(context)
 
     final_reply_to = reply_to
     if sender and not final_reply_to:
         final_reply_to = sender.email
 
-    send_message_with_content(
-        subject=substitute(context, subject),
-        content=substitute(context, content),
+    build_message(
+        subject=subject_template.render(values),
+        content=content_template.render(values),
         destination=application.user,
         reply_to=final_reply_to,
-    )
+        content_html=compile_html_template(content + FOOTER_MD).render(values),
+        priority=priority,
+    ).save()
 
     # TODO: this logic probably belongs elsewhere.
     match kind:
@@ -127,21 +393,405 @@ def send_message(
     application.save()
 
 
+def send_bulk_messages(
+    app_form: models.ApplicationForm,
+    sender: models.User | None,
+    kind: models.SendEmailContextType | None,
+    subject: str,
+    content: str,
+    recipients: QuerySet[models.User],
+    reply_to: str | None = None,
+    template: models.MessageTemplate | None = None,
+    schedules: dict[uuid.UUID, list[avail.ScheduleEntry]] | None = None,
+) -> int:
+    """Batch equivalent of send_message() for many recipients on one form.
+
+    Applications are resolved in a single query, Messages are rendered outside
+    the transaction and persisted with one bulk_create(), and status changes
+    are applied with one UPDATE (plus one DELETE of Crew Assignments for
+    rejections). If `template` is supplied and deferred rendering is enabled,
+    Messages reference it instead and are rendered by the outbox worker.
+
+    Schedule emails record a ScheduleSnapshot of each recipient's effective
+    assignments, from `schedules` if the caller has already built them.
+    Schedule updates also summarize the changes since the last snapshot in
+    each Message, so they're always rendered here.
+    Returns the number of Messages queued."""
+    event = app_form.event
+    league = event.league
+    prefetch_related_objects([app_form], "role_groups")
+
+    applications: dict[str, models.Application] = {}
+    for application in (
+        app_form.applications.filter(user__in=recipients)
+        .exclude(status=models.ApplicationStatus.WITHDRAWN)
+        .select_related("user")
+        .order_by("created_at")
+    ):
+        applications.setdefault(application.user_id, application)
+
+    # Status changes still apply to suppressed addresses; only the mail is skipped.
+    suppressed = models.EmailSuppression.suppressed(
+        application.user.email for application in applications.values()
+    )
+
+    changes: dict[uuid.UUID, avail.ScheduleChanges] | None = None
+    if schedules is None and kind in (
+        models.SendEmailContextType.SCHEDULE,
+        models.SendEmailContextType.SCHEDULE_UPDATE,
+    ):
+        schedules = avail.current_schedules(app_form)
+    if kind == models.SendEmailContextType.SCHEDULE_UPDATE:
+        changes = avail.schedule_changes(app_form, applications.values(), schedules)
+        # The summary goes between the body and the footer.
+        body = content
+    else:
+        body = content + FOOTER_MD
+
+    subject_template = compile_template(subject)
+    content_template = compile_template(body)
+    html_template = compile_html_template(body)
+    resolver = MergeValueResolver(subject_template.fields + content_template.fields)
+
+    final_reply_to = reply_to
+    if sender and not final_reply_to:
+        final_reply_to = sender.email
+
+    defer = (
+        template is not None
+        and settings.STAVE_EMAIL_DEFER_RENDERING
+        and kind != models.SendEmailContextType.SCHEDULE_UPDATE
+    )
+    language = translation.get_language()
+    # A one-off send to a single applicant shouldn't wait behind blasts.
+    priority = (
+        models.MessagePriority.BULK
+        if len(applications) > 1
+        else models.MessagePriority.NORMAL
+    )
+
+    outgoing = []
+    for application in applications.values():
+        if application.user.email.lower() in suppressed:
+            continue
+
+        if defer:
+            outgoing.append(
+                models.Message(
+                    template=template,
+                    application=application,
+                    user=application.user,
+                    sender=sender,
+                    reply_to=final_reply_to,
+                    language=language,
+                    priority=priority,
+                )
+            )
+            continue
+
+        application.form = app_form
+        context = models.MergeContext(
+            league=league,
+            event=event,
+            app_form=app_form,
+            application=application,
+            user=application.user,
+            sender=sender,
+        )
+        values = resolver.resolve(context)
+        content_plain_text = content_template.render(values)
+        content_html = html_template.render(values)
+        if changes is not None:
+            tail = (
+                render_schedule_changes(changes[application.id], league.time_zone)
+                + FOOTER_MD
+            )
+            content_plain_text += tail
+            content_html += render_html(tail)
+
+        outgoing.append(
+            build_message(
+                subject=subject_template.render(values),
+                content=content_plain_text,
+                content_html=content_html,
+                destination=application.user,
+                reply_to=final_reply_to,
+                priority=priority,
+            )
+        )
+
+    match kind:
+        case models.SendEmailContextType.INVITATION:
+            new_status = models.ApplicationStatus.INVITED
+        case models.SendEmailContextType.REJECTION:
+            new_status = models.ApplicationStatus.REJECTED
+        case (
+            models.SendEmailContextType.SCHEDULE
+            | models.SendEmailContextType.SCHEDULE_UPDATE
+        ):
+            new_status = models.ApplicationStatus.ASSIGNED
+        case _:
+            new_status = None
+
+    with transaction.atomic():
+        models.Message.objects.bulk_create(outgoing)
+
+        if schedules is not None:
+            avail.record_schedule_snapshots(applications.values(), schedules)
+
+        if new_status is not None and applications:
+            models.Application.objects.filter(
+                id__in=[application.id for application in applications.values()]
+            ).update(status=new_status)
+            models.ApplicationStatusCount.objects.refresh([app_form.id])
+
+            if new_status == models.ApplicationStatus.REJECTED:
+                # Remove any assignments for these users.
+                models.CrewAssignment.objects.filter(
+                    user_id__in=applications.keys(),
+                    crew__event=event,
+                    role__role_group__in=app_form.role_groups.all(),
+                ).delete()
+
+    return len(outgoing)
+
+
+def get_builtin_template(kind: models.BuiltinMessageTemplate) -> tuple[str, str]:
+    match kind:
+        case models.BuiltinMessageTemplate.APPLICATION_RECEIVED:
+            return (
+                gettext("Your application to {event.name}"),
+                gettext(
+                    "We received your application to [{event.name}]({event.link}). "
+                    "You can manage your [application]({application.link}) on Stave. "
+                    "You'll receive an email when the {event.name} organizers update "
+                    "your application.\n\n"
+                    "Please don't reply to this message. It is not monitored.\n\n"
+                    "Thank you for your application!"
+                ),
+            )
+
+
+def send_builtin_message(
+    application: models.Application, kind: models.BuiltinMessageTemplate
+):
+    if settings.STAVE_EMAIL_DEFER_RENDERING:
+        models.Message.objects.create(
+            builtin_template=kind,
+            application=application,
+            user=application.user,
+            language=translation.get_language(),
+            priority=models.MessagePriority.TRANSACTIONAL,
+        )
+    else:
+        send_message(
+            application,
+            None,
+            None,
+            *get_builtin_template(kind),
+            priority=models.MessagePriority.TRANSACTIONAL,
+        )
+
+
+class DeferredMessageRenderer:
+    """Renders deferred Messages in place at send time.
+
+    Compiled templates and batch-scoped merge values are shared between
+    Messages for the same template, form and sender."""
+
+    def __init__(self):
+        self.resolvers: dict[tuple, MergeValueResolver] = {}
+
+    def render(self, message: models.Message):
+        application = message.application
+        app_form = application.form
+
+        with translation.override(message.language):
+            if message.builtin_template:
+                subject, content = get_builtin_template(message.builtin_template)
+            elif message.template:
+                subject, content = message.template.subject, message.template.content
+            else:
+                raise ValueError(f"Message {message.id} has no template to render")
+
+            subject_template = compile_template(subject)
+            content_template = compile_template(content + FOOTER_MD)
+            resolver = self.resolvers.setdefault(
+                (
+                    message.builtin_template,
+                    message.template_id,
+                    message.language,
+                    app_form.id,
+                    message.sender_id,
+                ),
+                MergeValueResolver(subject_template.fields + content_template.fields),
+            )
+            values = resolver.resolve(
+                models.MergeContext(
+                    league=app_form.event.league,
+                    event=app_form.event,
+                    app_form=app_form,
+                    application=application,
+                    user=application.user,
+                    sender=message.sender,
+                )
+            )
+
+            rendered = build_message(
+                subject=subject_template.render(values),
+                content=content_template.render(values),
+                destination=application.user,
+                content_html=compile_html_template(content + FOOTER_MD).render(values),
+            )
+
+        message.subject = rendered.subject
+        message.content_plain_text = rendered.content_plain_text
+        message.content_html = rendered.content_html
+
+
+@lru_cache
+def rendered_footers() -> tuple[str, str]:
+    return (render_txt(FOOTER_MD), render_html(FOOTER_MD))
+
+
+def build_digest(messages: list[models.Message]) -> models.Message:
+    """Combine rendered Messages to one recipient, with the same reply-to
+    address, into a single digest Message, with one section per Message and a
+    single footer."""
+    footer_txt, footer_html = rendered_footers()
+
+    sections_txt = []
+    sections_html = []
+    for message in messages:
+        sections_txt.append(
+            f"{message.subject}\n\n{message.content_plain_text.removesuffix(footer_txt)}"
+        )
+        sections_html.append(
+            f"<h2>{html.escape(message.subject)}</h2>\n"
+            + message.content_html.removesuffix(footer_html)
+        )
+
+    with translation.override(messages[0].language):
+        subject = ngettext(
+            "{count} update from Stave", "{count} updates from Stave", len(messages)
+        ).format(count=len(messages))
+
+    return models.Message(
+        subject=subject,
+        content_plain_text="\n\n---\n\n".join(sections_txt) + footer_txt,
+        content_html="\n<hr>\n".join(sections_html) + "\n" + footer_html,
+        user=messages[0].user,
+        email=messages[0].email,
+        reply_to=messages[0].reply_to,
+        language=messages[0].language,
+    )
+
+
+def build_new_forms_content(forms: list[models.ApplicationForm]) -> str:
+    lines = []
+    for form in forms:
+        event = form.event
+        start_date = formats.localize(event.start_date, use_l10n=True)
+        lines.append(
+            f"- [{form}](https://stave.app{form.get_absolute_url()}): "
+            f"{event.league.name}, {start_date}"
+        )
+
+    return (
+        gettext("Applications are now open for events from leagues you follow:")
+        + "\n\n"
+        + "\n".join(lines)
+        + SUBSCRIPTION_FOOTER_MD
+    )
+
+
+def send_subscriber_notifications(forms: list[models.ApplicationForm]) -> int:
+    """Queue one Message per subscriber listing the forms from their leagues.
+
+    Subscribers come from a single query across all of the forms' leagues, and
+    recipients following the same leagues share one rendering. Returns the
+    number of Messages queued."""
+    forms_by_league: dict[uuid.UUID, list[models.ApplicationForm]] = {}
+    for form in forms:
+        forms_by_league.setdefault(form.event.league_id, []).append(form)
+
+    leagues_by_recipient: dict[tuple[uuid.UUID, str], set[uuid.UUID]] = {}
+    for user_id, email, league_id in models.League.objects.filter(
+        id__in=forms_by_league.keys()
+    ).subscribers():
+        leagues_by_recipient.setdefault((user_id, email), set()).add(league_id)
+
+    suppressed = models.EmailSuppression.suppressed(
+        email for _, email in leagues_by_recipient
+    )
+
+    rendered: dict[frozenset[uuid.UUID], models.Message] = {}
+    outgoing = []
+    for (user_id, email), league_ids in leagues_by_recipient.items():
+        if email.lower() in suppressed:
+            continue
+
+        key = frozenset(league_ids)
+        if key not in rendered:
+            user_forms = [form for form in forms if form.event.league_id in league_ids]
+            if len(user_forms) == 1:
+                subject = gettext("Applications are open for {event}").format(
+                    event=user_forms[0].event.name
+                )
+            else:
+                subject = gettext("{count} new application forms are open").format(
+                    count=len(user_forms)
+                )
+            rendered[key] = build_message(
+                subject, build_new_forms_content(user_forms), email
+            )
+
+        template = rendered[key]
+        outgoing.append(
+            models.Message(
+                subject=template.subject,
+                content_plain_text=template.content_plain_text,
+                content_html=template.content_html,
+                user_id=user_id,
+                language=template.language,
+                priority=models.MessagePriority.BULK,
+            )
+        )
+
+    models.Message.objects.bulk_create(outgoing, batch_size=500)
+    return len(outgoing)
+
+
 class ReminderEmail[T](ABC):
+    """A recurring email about items that have a `next_reminder_at` column.
+
+    The reminder job selects only items whose `next_reminder_at` has passed,
+    so a reminder type costs one indexed query per run when nothing is due.
+    Implementations set `next_reminder_at` to None once an item no longer
+    needs reminders."""
+
+    interval: timedelta
+    update_fields = ["next_reminder_at"]
+
     def get_queryset(self) -> QuerySet[T]: ...
 
     def get_message(self, item: T) -> (str, str, str): ...
 
-    def is_due(self, item: T) -> bool: ...
+    def get_due_queryset(self, now: datetime) -> QuerySet[T]:
+        return self.get_queryset().filter(next_reminder_at__lte=now)
 
-    def update_for_sent_message(self, item: T) -> None: ...
+    def update_for_message_sent(self, item: T, now: datetime) -> None:
+        item.next_reminder_at = now + self.interval
 
 
 class LeagueUserInvitationReminder(ReminderEmail[models.LeagueUserInvitation]):
+    interval = timedelta(hours=72)
+    update_fields = ["next_reminder_at", "last_date_message_sent"]
+
     def get_queryset(self) -> QuerySet[models.LeagueUserInvitation]:
         return models.LeagueUserInvitation.objects.filter(
             status=models.LeagueUserInvitationStatus.OPEN
-        )
+        ).select_related("league")
 
     def get_message(self, item: models.LeagueUserInvitation) -> (str, str, str):
         return (
@@ -160,11 +810,8 @@ class LeagueUserInvitationReminder(ReminderEmail[models.LeagueUserInvitation]):
             item.email,
         )
 
-    def is_due(self, item: models.LeagueUserInvitation) -> bool:
-        return not item.last_date_message_sent or (
-            datetime.now(tz=timezone.utc) - item.last_date_message_sent
-        ) >= timedelta(hours=72)
-
-    def update_for_message_sent(self, item: models.LeagueUserInvitation) -> None:
-        item.last_date_message_sent = datetime.now(tz=timezone.utc)
-        item.save()
+    def update_for_message_sent(
+        self, item: models.LeagueUserInvitation, now: datetime
+    ) -> None:
+        super().update_for_message_sent(item, now)
+        item.last_date_message_sent = now
@@ -1,46 +1,328 @@
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
 import allauth.account.models
-from django.core.mail import EmailMultiAlternatives
+from anymail.message import AnymailMessage
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django_apscheduler.util import close_old_connections
 from django.db import transaction
-from . import models, settings, emails
+from django.db.models import Q, QuerySet
+from . import models, emails, mail, partitions
 
 
-@close_old_connections
-def send_emails():
-    for message in models.Message.objects.filter(
-        sent=False, tries__lt=settings.STAVE_EMAIL_MAX_TRIES
-    ):
-        try:
-            email = EmailMultiAlternatives(
-                subject=message.subject,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[message.user.email if message.user else message.email],
-                body=message.content_plain_text,
-            )
-            if message.reply_to:
-                email.reply_to = [message.reply_to]
+def build_email(message: models.Message, connection) -> EmailMultiAlternatives:
+    email = EmailMultiAlternatives(
+        subject=message.subject,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[message.recipient],
+        body=message.content_plain_text,
+        connection=connection,
+    )
+    if message.reply_to:
+        email.reply_to = [message.reply_to]
+
+    if message.content_html:
+        email.attach_alternative(message.content_html, "text/html")
+
+    return email
+
+
+def send_message(message: models.Message, connection, limiter: mail.SendRateLimiter):
+    limiter.acquire()
+    try:
+        build_email(message, connection).send()
+    except Exception as e:
+        if mail.is_throttling_error(e):
+            # Not the message's fault; leave it for the next run.
+            logging.getLogger().warning(f"Throttled sending message {message}")
+            limiter.throttled()
+            return
+
+        logging.getLogger().error(f"Could not send message {message}: {e}")
+        message.tries += 1
+    else:
+        message.sent_date = datetime.now(tz=timezone.utc)
+        message.sent = True
+
 
-            email.attach_alternative(message.content_html, "text/html")
+def send_batch(
+    messages: list[models.Message], connection, limiter: mail.SendRateLimiter
+):
+    """Send Messages that share a reply-to address as one provider batch send.
 
-            email.send()
-        except Exception as e:
-            logging.getLogger().error(f"Could not send message {message}: {e}")
+    The provider template named by STAVE_EMAIL_BATCH_TEMPLATE_ID is expected
+    to pass its `subject`, `text` and `html` merge fields straight through, so
+    each recipient gets exactly the content we rendered for them."""
+    email = AnymailMessage(
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[message.recipient for message in messages],
+        template_id=settings.STAVE_EMAIL_BATCH_TEMPLATE_ID,
+        merge_data={
+            message.recipient: {
+                "subject": message.subject,
+                "text": message.content_plain_text,
+                "html": message.content_html,
+            }
+            for message in messages
+        },
+        connection=connection,
+    )
+    if messages[0].reply_to:
+        email.reply_to = [messages[0].reply_to]
+
+    # The provider counts each recipient of a batch against the send rate.
+    limiter.acquire(len(messages))
+    try:
+        email.send()
+    except Exception as e:
+        if mail.is_throttling_error(e):
+            logging.getLogger().warning(f"Throttled sending batch of {len(messages)}")
+            limiter.throttled()
+            return
+
+        logging.getLogger().error(f"Could not send batch of {len(messages)}: {e}")
+        for message in messages:
+            message.tries += 1
+        return
+
+    now = datetime.now(tz=timezone.utc)
+    for message in messages:
+        status = email.anymail_status.recipients.get(message.recipient)
+        if status and status.status in ("failed", "invalid", "rejected"):
+            logging.getLogger().error(
+                f"Could not send message {message}: {status.status}"
+            )
             message.tries += 1
         else:
-            message.sent_date = datetime.now(tz=timezone.utc)
+            message.sent_date = now
             message.sent = True
 
-        message.save()
+
+def retention_cutoff() -> datetime:
+    return datetime.now(tz=timezone.utc) - timedelta(
+        days=settings.STAVE_EMAIL_RETENTION_DAYS
+    )
+
+
+def outbox() -> QuerySet[models.Message]:
+    return (
+        models.Message.objects.filter(
+            sent=False,
+            suppressed=False,
+            tries__lt=settings.STAVE_EMAIL_MAX_TRIES,
+            # Lets Postgres skip all but the most recent partitions.
+            created_at__gte=retention_cutoff(),
+        )
+        .select_related(
+            "user",
+            "sender",
+            "template",
+            "application__user",
+            "application__form__event__league",
+        )
+        .prefetch_related("application__form__role_groups")
+    )
+
+
+def pending_messages(
+    priority: models.MessagePriority, limit: int, exclude: set
+) -> list[models.Message]:
+    queryset = outbox().filter(priority=priority).exclude(id__in=exclude)
+    if digest_window() and priority != models.MessagePriority.TRANSACTIONAL:
+        # Hold non-urgent mail for the digest window so it can be coalesced.
+        queryset = queryset.filter(
+            created_at__lte=datetime.now(tz=timezone.utc) - digest_window()
+        )
+
+    return list(queryset.order_by("created_at")[:limit])
+
+
+def digest_window() -> timedelta | None:
+    if settings.STAVE_EMAIL_DIGEST_MINUTES:
+        return timedelta(minutes=settings.STAVE_EMAIL_DIGEST_MINUTES)
+
+
+def digest_companions(
+    messages: list[models.Message], exclude: set
+) -> list[models.Message]:
+    """Other pending non-urgent Messages to the recipients of `messages`,
+    including ones still inside the digest window."""
+    return list(
+        outbox()
+        .exclude(priority=models.MessagePriority.TRANSACTIONAL)
+        .exclude(id__in=exclude)
+        .filter(
+            Q(user_id__in={m.user_id for m in messages if m.user_id})
+            | Q(email__in={m.email for m in messages if m.email})
+        )
+        .order_by("created_at")
+    )
+
+
+def send_digest(
+    messages: list[models.Message], connection, limiter: mail.SendRateLimiter
+):
+    digest = emails.build_digest(messages)
+    send_message(digest, connection, limiter)
+    for message in messages:
+        message.sent = digest.sent
+        message.sent_date = digest.sent_date
+        message.tries += digest.tries
+
+
+def send_messages(
+    messages: list[models.Message],
+    renderer: emails.DeferredMessageRenderer,
+    connection,
+    limiter: mail.SendRateLimiter,
+):
+    suppressed = models.EmailSuppression.suppressed(
+        message.recipient for message in messages
+    )
+    rendered = []
+    for message in messages:
+        if message.recipient and message.recipient.lower() in suppressed:
+            message.suppressed = True
+            continue
+
+        if message.deferred:
+            # Rendered content is only held in memory, never stored.
+            try:
+                renderer.render(message)
+            except Exception as e:
+                logging.getLogger().error(f"Could not render message {message}: {e}")
+                message.tries += 1
+                message.save(update_fields=["tries"])
+                continue
+
+        rendered.append(message)
+
+    digests = []
+    if digest_window():
+        # Replies should reach whoever sent each message, so a recipient gets
+        # one digest per reply-to address.
+        by_recipient = defaultdict(list)
+        for message in rendered:
+            if message.priority != models.MessagePriority.TRANSACTIONAL:
+                by_recipient[(message.recipient, message.reply_to)].append(message)
+        digests = [group for group in by_recipient.values() if len(group) > 1]
+
+    digested = {message.id for digest in digests for message in digest}
+    singles = []
+    batches = defaultdict(list)
+    for message in rendered:
+        if message.id in digested:
+            continue
+
+        if settings.STAVE_EMAIL_BATCH_SEND and message.template_id:
+            batch = batches[(message.template_id, message.reply_to)]
+            # Merge data is keyed by address, so repeat recipients go alone.
+            if any(m.recipient == message.recipient for m in batch):
+                singles.append(message)
+            else:
+                batch.append(message)
+        else:
+            singles.append(message)
+
+    # Each send's outcome is saved as soon as the provider has it, so that a
+    # worker that dies partway through a chunk doesn't send it all again.
+    save_status([message for message in messages if message.suppressed])
+    for digest in digests:
+        send_digest(digest, connection, limiter)
+        save_status(digest)
+
+    for message in singles:
+        send_message(message, connection, limiter)
+        save_status([message])
+
+    for batch in batches.values():
+        if len(batch) == 1:
+            send_message(batch[0], connection, limiter)
+            save_status(batch)
+            continue
+
+        for i in range(0, len(batch), settings.STAVE_EMAIL_BATCH_SIZE):
+            provider_batch = batch[i : i + settings.STAVE_EMAIL_BATCH_SIZE]
+            send_batch(provider_batch, connection, limiter)
+            save_status(provider_batch)
+
+
+def save_status(messages: list[models.Message]):
+    models.Message.objects.bulk_update(
+        messages, ["sent", "sent_date", "tries", "suppressed"]
+    )
+
+
+@close_old_connections
+def send_emails():
+    """Send pending Messages lane by lane, up to each lane's budget per run.
+
+    Transactional mail goes first, and is drained again after every chunk of
+    the lower-priority lanes so it never waits behind a blast. In digest mode,
+    each due non-urgent Message is sent together with any others pending for
+    the same recipient."""
+    renderer = emails.DeferredMessageRenderer()
+    # EMAIL_BACKEND is the outbox itself; this is where mail actually leaves.
+    connection = get_connection(settings.STAVE_EMAIL_DELIVERY_BACKEND)
+    limiter = mail.SendRateLimiter()
+    budgets = settings.STAVE_EMAIL_LANE_BUDGETS
+    attempted = set()
+
+    def drain(priority: models.MessagePriority, limit: int) -> int:
+        messages = pending_messages(priority, limit, attempted)
+        attempted.update(message.id for message in messages)
+        if messages and digest_window() and priority != transactional:
+            companions = digest_companions(messages, attempted)
+            attempted.update(message.id for message in companions)
+            messages += companions
+
+        send_messages(messages, renderer, connection, limiter)
+        return len(messages)
+
+    transactional = models.MessagePriority.TRANSACTIONAL
+    drain(transactional, budgets[transactional.name])
+    for priority in [models.MessagePriority.NORMAL, models.MessagePriority.BULK]:
+        remaining = budgets[priority.name]
+        while remaining > 0:
+            sent = drain(priority, min(remaining, settings.STAVE_EMAIL_LANE_CHUNK_SIZE))
+            if not sent:
+                break
+
+            remaining -= sent
+            drain(transactional, budgets[transactional.name])
 
 
 @close_old_connections
 def delete_old_messages():
-    models.Message.objects.filter(
-        sent=True, sent_date__lte=datetime.now(tz=timezone.utc) - timedelta(days=7)
-    ).delete()
+    # The outbox only retries Messages within the retention window. Those that
+    # aged out unsent are marked failed, like Messages that ran out of tries.
+    failed = models.Message.objects.filter(
+        sent=False,
+        suppressed=False,
+        tries__lt=settings.STAVE_EMAIL_MAX_TRIES,
+        created_at__lt=retention_cutoff(),
+    ).update(tries=settings.STAVE_EMAIL_MAX_TRIES)
+    if failed:
+        logging.getLogger().error(
+            f"Gave up on {failed} messages unsent after "
+            f"{settings.STAVE_EMAIL_RETENTION_DAYS} days"
+        )
+
+    if partitions.enabled():
+        # Retention is mostly a matter of dropping whole weeks of Messages.
+        partitions.ensure_partitions()
+        dropped = partitions.drop_expired_partitions(
+            timedelta(days=settings.STAVE_EMAIL_RETENTION_DAYS)
+        )
+        logging.info(f"Dropped Message partitions {dropped}")
+    else:
+        cutoff = retention_cutoff()
+        models.Message.objects.filter(
+            Q(sent=True, sent_date__lte=cutoff)
+            | Q(suppressed=True, created_at__lte=cutoff)
+        ).delete()
 
 
 @close_old_connections
@@ -51,10 +333,40 @@ def update_event_statuses():
         start_date__lte=datetime.now(tz=timezone.utc),
     ).update(status=models.EventStatus.IN_PROGRESS)
 
-    models.Event.objects.filter(
-        status=models.EventStatus.IN_PROGRESS,
-        end_date__lt=datetime.now(tz=timezone.utc),
-    ).update(status=models.EventStatus.COMPLETE)
+    with transaction.atomic():
+        completed = list(
+            models.Event.objects.filter(
+                status=models.EventStatus.IN_PROGRESS,
+                end_date__lt=datetime.now(tz=timezone.utc),
+            ).values_list("id", flat=True)
+        )
+        models.Event.objects.filter(id__in=completed).update(
+            status=models.EventStatus.COMPLETE
+        )
+        models.GameHistory.objects.record(completed)
+
+
+@close_old_connections
+def notify_subscribers():
+    """Tell subscribers about forms that have been listed since the last run,
+    whether because the form was published or because its event opened."""
+    with transaction.atomic():
+        forms = list(
+            models.ApplicationForm.objects.awaiting_subscriber_notification()
+            .select_related("event", "event__league")
+            .prefetch_related("role_groups")
+            .order_by("event__start_date", "slug")
+            .select_for_update(skip_locked=True, of=("self",))
+        )
+        if not forms:
+            return
+
+        count = emails.send_subscriber_notifications(forms)
+        models.ApplicationForm.objects.filter(
+            id__in=[form.id for form in forms]
+        ).update(subscribers_notified_at=datetime.now(tz=timezone.utc))
+
+    logging.info(f"Notified {count} subscribers of {len(forms)} new forms")
 
 
 @close_old_connections
@@ -75,18 +387,36 @@ def clean_up_unconfirmed_users():
 
 @close_old_connections
 def send_reminder_emails():
+    now = datetime.now(tz=timezone.utc)
+    chunk_size = settings.STAVE_REMINDER_CHUNK_SIZE
     for email_type in [emails.LeagueUserInvitationReminder]:
-        with transaction.atomic():
-            email_type_instance = email_type()
-            for item in email_type_instance.get_queryset().select_for_update():
-                if email_type_instance.is_due(item):
-                    (subj, content, destination) = email_type_instance.get_message(item)
-                    emails.send_message_with_content(
-                        subj,
-                        content,
-                        destination,
+        reminder = email_type()
+        while True:
+            with transaction.atomic():
+                # Concurrent runs skip each other's rows instead of waiting.
+                items = list(
+                    reminder.get_due_queryset(now)
+                    .order_by("next_reminder_at")
+                    .select_for_update(skip_locked=True)[:chunk_size]
+                )
+                outgoing = []
+                for item in items:
+                    (subj, content, destination) = reminder.get_message(item)
+                    outgoing.append(
+                        emails.build_message(
+                            subj,
+                            content,
+                            destination,
+                            priority=models.MessagePriority.TRANSACTIONAL,
+                        )
                     )
-                    email_type_instance.update_for_message_sent(item)
+                    reminder.update_for_message_sent(item, now)
+
+                models.Message.objects.bulk_create(outgoing)
+                reminder.get_queryset().bulk_update(items, reminder.update_fields)
+
+            if len(items) < chunk_size:
+                break
 
 
 @close_old_connections
@@ -0,0 +1,148 @@
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils.html import strip_tags
+
+from . import models
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Email backend that queues mail in the Message outbox at transactional
+    priority, to be delivered by the send_emails job, instead of sending it
+    inside the request.
+
+    Mail the outbox can't represent (attachments, cc/bcc, custom headers or a
+    non-default sender) is handed straight to STAVE_EMAIL_DELIVERY_BACKEND."""
+
+    def send_messages(self, email_messages: list[EmailMessage]) -> int:
+        queued = []
+        direct = []
+        for email in email_messages:
+            if self.can_queue(email):
+                queued.extend(self.to_messages(email))
+            else:
+                direct.append(email)
+
+        if queued:
+            models.Message.objects.bulk_create(queued)
+
+        sent = len(email_messages) - len(direct)
+        if direct:
+            connection = get_connection(
+                settings.STAVE_EMAIL_DELIVERY_BACKEND, fail_silently=self.fail_silently
+            )
+            sent += connection.send_messages(direct) or 0
+
+        return sent
+
+    def can_queue(self, email: EmailMessage) -> bool:
+        return (
+            email.to
+            and not email.cc
+            and not email.bcc
+            and not email.attachments
+            and not email.extra_headers
+            and len(email.reply_to) <= 1
+            and email.from_email in (None, settings.DEFAULT_FROM_EMAIL)
+            and all(len(address) <= 256 for address in email.to + email.reply_to)
+        )
+
+    def to_messages(self, email: EmailMessage) -> list[models.Message]:
+        if email.content_subtype == "html":
+            content_html = email.body
+            content_plain_text = strip_tags(email.body)
+        else:
+            content_plain_text = email.body
+            content_html = next(
+                (
+                    content
+                    for content, mimetype in getattr(email, "alternatives", [])
+                    if mimetype == "text/html"
+                ),
+                "",
+            )
+
+        return [
+            models.Message(
+                subject=email.subject[:256],
+                content_plain_text=content_plain_text,
+                content_html=content_html,
+                email=address,
+                reply_to=email.reply_to[0] if email.reply_to else None,
+                priority=models.MessagePriority.TRANSACTIONAL,
+            )
+            for address in email.to
+        ]
+
+
+THROTTLING_ERROR_CODES = ("Throttling", "TooManyRequests", "MaxSendRateExceeded")
+
+
+def is_throttling_error(error: Exception) -> bool:
+    if getattr(error, "status_code", None) == 429:
+        return True
+
+    return any(code in repr(error.args) for code in THROTTLING_ERROR_CODES)
+
+
+class SendRateLimiter:
+    """Token bucket matched to the provider's send quota.
+
+    The bucket lives in a SendRateLimit row so that every worker process
+    draws from the same quota. Callers reserve tokens under a row lock and
+    sleep outside the transaction until their reservation is covered.
+
+    The rate is adaptive: a throttling response halves it (down to
+    STAVE_EMAIL_MIN_SEND_RATE), and it recovers linearly by
+    STAVE_EMAIL_SEND_RATE_RECOVERY per second up to STAVE_EMAIL_SEND_RATE."""
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+
+    def _locked_bucket(self, now: datetime) -> models.SendRateLimit:
+        bucket, _ = models.SendRateLimit.objects.select_for_update().get_or_create(
+            name=self.name,
+            defaults={
+                "tokens": settings.STAVE_EMAIL_SEND_RATE,
+                "rate": settings.STAVE_EMAIL_SEND_RATE,
+                "updated_at": now,
+            },
+        )
+        elapsed = max((now - bucket.updated_at).total_seconds(), 0)
+        bucket.rate = min(
+            settings.STAVE_EMAIL_SEND_RATE,
+            bucket.rate + settings.STAVE_EMAIL_SEND_RATE_RECOVERY * elapsed,
+        )
+        # The bucket holds at most one second's worth of sends.
+        bucket.tokens = min(bucket.rate, bucket.tokens + bucket.rate * elapsed)
+        bucket.updated_at = now
+
+        return bucket
+
+    def acquire(self, count: int = 1):
+        """Block until `count` sends are permitted."""
+        if not settings.STAVE_EMAIL_SEND_RATE:
+            return
+
+        with transaction.atomic():
+            bucket = self._locked_bucket(datetime.now(tz=timezone.utc))
+            bucket.tokens -= count
+            bucket.save()
+
+        if bucket.tokens < 0:
+            time.sleep(-bucket.tokens / bucket.rate)
+
+    def throttled(self):
+        """Record a throttling response from the provider."""
+        if not settings.STAVE_EMAIL_SEND_RATE:
+            return
+
+        with transaction.atomic():
+            bucket = self._locked_bucket(datetime.now(tz=timezone.utc))
+            bucket.rate = max(settings.STAVE_EMAIL_MIN_SEND_RATE, bucket.rate / 2)
+            bucket.tokens = min(bucket.tokens, 0)
+            bucket.save()
@@ -0,0 +1,216 @@
+import random
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import models as db_models
+from django.db import transaction
+
+from stave import models
+
+
+class Rollback(Exception):
+    pass
+
+
+# The JOIN + DISTINCT forms these querysets had before they moved to correlated
+# EXISTS subqueries (listed, accessible, submittable) or dropped the DISTINCT
+# (manageable), kept here as the benchmark's baseline.
+def legacy_form_manageable(user: models.User) -> db_models.QuerySet:
+    return (
+        models.ApplicationForm.objects.filter(
+            event__league__user_permissions__permission=models.UserPermission.EVENT_MANAGER,
+            event__league__user_permissions__user=user,
+        )
+        .distinct()
+        .exclude(
+            event__status__in=[models.EventStatus.CANCELED, models.EventStatus.COMPLETE]
+        )
+    )
+
+
+def legacy_form_listed(user: models.User) -> db_models.QuerySet:
+    return (
+        legacy_form_manageable(user)
+        | models.ApplicationForm.objects.filter(
+            closed=False,
+            hidden=False,
+            event__status=models.EventStatus.OPEN,
+            event__league__enabled=True,
+        ).distinct()
+    ).order_by("close_date", "event__start_date")
+
+
+def legacy_form_accessible(user: models.User) -> db_models.QuerySet:
+    return models.ApplicationForm.objects.filter(
+        event__league__enabled=True,
+    ).exclude(
+        event__status=models.EventStatus.DRAFTING
+    ).distinct() | legacy_form_manageable(user)
+
+
+def legacy_form_submittable(user: models.User) -> db_models.QuerySet:
+    return (
+        models.ApplicationForm.objects.filter(
+            event__status__in=[models.EventStatus.OPEN, models.EventStatus.LINK_ONLY],
+            event__league__enabled=True,
+        ).distinct()
+        | legacy_form_manageable(user)
+    ).exclude(closed=True)
+
+
+def legacy_league_manageable(user: models.User) -> db_models.QuerySet:
+    return models.League.objects.filter(
+        user_permissions__permission=models.UserPermission.LEAGUE_MANAGER,
+        user_permissions__user=user,
+    ).distinct()
+
+
+def legacy_event_manageable(user: models.User) -> db_models.QuerySet:
+    return models.Event.objects.filter(
+        league__user_permissions__permission=models.UserPermission.EVENT_MANAGER,
+        league__user_permissions__user=user,
+    ).distinct()
+
+
+CASES: list[tuple[str, Callable, Callable]] = [
+    (
+        "ApplicationForm.listed",
+        legacy_form_listed,
+        lambda user: models.ApplicationForm.objects.listed(user),
+    ),
+    (
+        "ApplicationForm.accessible",
+        legacy_form_accessible,
+        lambda user: models.ApplicationForm.objects.accessible(user),
+    ),
+    (
+        "ApplicationForm.submittable",
+        legacy_form_submittable,
+        lambda user: models.ApplicationForm.objects.submittable(user),
+    ),
+    (
+        "ApplicationForm.manageable",
+        legacy_form_manageable,
+        lambda user: models.ApplicationForm.objects.manageable(user),
+    ),
+    (
+        "League.manageable",
+        legacy_league_manageable,
+        lambda user: models.League.objects.manageable(user),
+    ),
+    (
+        "Event.manageable",
+        legacy_event_manageable,
+        lambda user: models.Event.objects.manageable(user),
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = "compare permission-scoped querysets against their JOIN + DISTINCT forms on seeded data. Seeded data is rolled back."
+
+    def add_arguments(self, parser):  # type: ignore
+        parser.add_argument("--leagues", type=int, default=200)
+        parser.add_argument("--events-per-league", type=int, default=25)
+        parser.add_argument("--forms-per-event", type=int, default=2)
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--grants-per-user", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *_args, **options):  # type: ignore
+        try:
+            with transaction.atomic():
+                self.seed(options)
+                self.benchmark(options["repeat"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def seed(self, options: dict) -> None:
+        rng = random.Random(options["seed"])
+        self.stdout.write("Seeding benchmark data...")
+
+        leagues = models.League.objects.bulk_create(
+            models.League(
+                name=f"Benchmark League {i}",
+                slug=f"benchmark-league-{i}",
+                location="Benchmark",
+                enabled=rng.random() < 0.9,
+            )
+            for i in range(options["leagues"])
+        )
+        statuses = list(models.EventStatus)
+        events = models.Event.objects.bulk_create(
+            models.Event(
+                league=league,
+                name=f"Event {i}",
+                slug=f"event-{i}",
+                status=rng.choice(statuses),
+                start_date=date(2030, 1, 1) + timedelta(days=i),
+                end_date=date(2030, 1, 1) + timedelta(days=i),
+                location="Benchmark",
+            )
+            for league in leagues
+            for i in range(options["events_per_league"])
+        )
+        models.ApplicationForm.objects.bulk_create(
+            models.ApplicationForm(
+                event=event,
+                slug=f"form-{i}",
+                application_kind=models.ApplicationKind.ASSIGN_ONLY,
+                application_availability_kind=models.ApplicationAvailabilityKind.WHOLE_EVENT,
+                closed=rng.random() < 0.2,
+                hidden=rng.random() < 0.1,
+                close_date=event.start_date,
+                intro_text="",
+            )
+            for event in events
+            for i in range(options["forms_per_event"])
+        )
+        users = models.User.objects.bulk_create(
+            models.User(
+                preferred_name=f"Benchmark User {i}",
+                email=f"benchmark-{i}@example.com",
+            )
+            for i in range(options["users"])
+        )
+        permissions = list(models.UserPermission)
+        models.LeagueUserPermission.objects.bulk_create(
+            (
+                models.LeagueUserPermission(
+                    user=user, league=league, permission=permission
+                )
+                for user in users
+                for league in rng.sample(leagues, options["grants_per_user"])
+                for permission in permissions
+            ),
+            batch_size=1000,
+        )
+        self.users = rng.sample(users, min(len(users), 20))
+
+    def benchmark(self, repeat: int) -> None:
+        for name, legacy, current in CASES:
+            timings = {}
+            for label, factory in (("before", legacy), ("after", current)):
+                elapsed = 0.0
+                for _ in range(repeat):
+                    for user in self.users:
+                        start = time.perf_counter()
+                        result = set(factory(user).values_list("pk", flat=True))
+                        elapsed += time.perf_counter() - start
+                timings[label] = elapsed / (repeat * len(self.users))
+
+            for user in self.users:
+                if set(legacy(user).values_list("pk", flat=True)) != set(
+                    current(user).values_list("pk", flat=True)
+                ):
+                    self.stderr.write(f"{name}: results differ for {user.pk}")
+
+            self.stdout.write(
+                f"{name}: before {timings['before'] * 1000:.2f} ms, "
+                f"after {timings['after'] * 1000:.2f} ms "
+                f"({len(result)} rows)"
+            )
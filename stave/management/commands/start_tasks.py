@@ -89,6 +89,15 @@ class Command(BaseCommand):
         )
         logger.info("Added job 'send_reminder_emails'.")
 
+        scheduler.add_job(
+            jobs.notify_subscribers,
+            trigger=CronTrigger(minute="*/5"),
+            id="notify_subscribers",
+            max_instances=1,
+            replace_existing=True,
+        )
+        logger.info("Added job 'notify_subscribers'.")
+
         scheduler.add_job(
             jobs.expire_league_user_invitations,
             trigger=CronTrigger(hour="*"),
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.14 on 2026-10-19 07:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0065_application_created_at_alter_league_time_zone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="application",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="messages",
+                to="stave.application",
+            ),
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="builtin_template",
+            field=models.CharField(
+                blank=True,
+                choices=[("application-received", "Application Received")],
+                max_length=64,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="language",
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="sender",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="template",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="messages",
+                to="stave.messagetemplate",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="content_html",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="content_plain_text",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="subject",
+            field=models.CharField(blank=True, default="", max_length=256),
+        ),
+    ]
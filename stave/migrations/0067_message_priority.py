@@ -0,0 +1,28 @@
+# Generated by Django 5.2.14 on 2026-10-19 07:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0066_message_deferred_rendering"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="priority",
+            field=models.IntegerField(
+                choices=[(1, "Transactional"), (2, "Normal"), (3, "Bulk")], default=2
+            ),
+        ),
+    ]
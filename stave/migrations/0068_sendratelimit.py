@@ -0,0 +1,24 @@
+# Generated by Django 5.2.14 on 2026-10-19 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0067_message_priority"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SendRateLimit",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("tokens", models.FloatField()),
+                ("rate", models.FloatField()),
+                ("updated_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.14 on 2026-10-19 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0068_sendratelimit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailSuppression",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("email", models.CharField(max_length=256, unique=True)),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("bounce", "Bounce"),
+                            ("complaint", "Complaint"),
+                            ("manual", "Manual"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="suppressed",
+            field=models.BooleanField(default=False),
+        ),
+    ]
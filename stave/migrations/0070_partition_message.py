@@ -0,0 +1,107 @@
+from datetime import datetime, time, timedelta, timezone
+
+from django.db import migrations
+
+TABLE = "stave_message"
+WEEK = timedelta(weeks=1)
+
+
+def week_start(moment: datetime) -> datetime:
+    day = moment.astimezone(timezone.utc).date()
+    return datetime.combine(day - timedelta(days=day.weekday()), time(), timezone.utc)
+
+
+def partition_message_table(apps, schema_editor):
+    """Rebuild stave_message as a table range-partitioned by week of created_at.
+
+    PostgreSQL only; other databases keep the plain table."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Message = apps.get_model("stave", "Message")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(created_at) FROM {TABLE}")
+        (earliest,) = cursor.fetchone()
+
+    now = datetime.now(tz=timezone.utc)
+    first_week = week_start(earliest or now)
+    last_week = week_start(now) + 4 * WEEK
+
+    schema_editor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned")
+    # Index names are schema-wide, so free up the primary key's.
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE}_unpartitioned "
+        f"RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_unpartitioned_pkey"
+    )
+    schema_editor.execute(
+        f"CREATE TABLE {TABLE} "
+        f"(LIKE {TABLE}_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    # The partition key must be part of the primary key. id alone stays the
+    # primary key as far as Django is concerned.
+    schema_editor.execute(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)")
+
+    for field in Message._meta.concrete_fields:
+        if not field.remote_field:
+            continue
+
+        target = field.target_field
+        schema_editor.execute(
+            f"CREATE INDEX {TABLE}_{field.column}_idx ON {TABLE} ({field.column})"
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_{field.column}_fk "
+            f"FOREIGN KEY ({field.column}) "
+            f"REFERENCES {target.model._meta.db_table} ({target.column}) "
+            "DEFERRABLE INITIALLY DEFERRED"
+        )
+
+    # Catches anything outside the weekly partitions kept by the
+    # delete_old_messages job.
+    schema_editor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+    week = first_week
+    while week <= last_week:
+        schema_editor.execute(
+            f"CREATE TABLE {TABLE}_w{week:%Y%m%d} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{week.isoformat()}') TO ('{(week + WEEK).isoformat()}')"
+        )
+        week += WEEK
+
+    schema_editor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_unpartitioned")
+    schema_editor.execute(f"DROP TABLE {TABLE}_unpartitioned")
+
+
+def unpartition_message_table(apps, schema_editor):
+    """Rebuild stave_message as the plain table Django created."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Message = apps.get_model("stave", "Message")
+    columns = ", ".join(
+        schema_editor.quote_name(field.column)
+        for field in Message._meta.concrete_fields
+    )
+
+    schema_editor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE}_partitioned "
+        f"RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_partitioned_pkey"
+    )
+    schema_editor.create_model(Message)
+    schema_editor.execute(
+        f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {TABLE}_partitioned"
+    )
+    # Drops every partition with it.
+    schema_editor.execute(f"DROP TABLE {TABLE}_partitioned")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0069_emailsuppression"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_message_table, unpartition_message_table),
+    ]
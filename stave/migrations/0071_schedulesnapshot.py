@@ -0,0 +1,38 @@
+# Generated by Django 5.2.14 on 2026-10-19 07:49
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0070_partition_message"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduleSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("entries", models.JSONField(blank=True, default=list)),
+                ("sent_at", models.DateTimeField(auto_now=True)),
+                (
+                    "application",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="schedule_snapshot",
+                        to="stave.application",
+                    ),
+                ),
+            ],
+        ),
+    ]
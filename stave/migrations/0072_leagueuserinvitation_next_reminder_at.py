@@ -0,0 +1,38 @@
+# Generated by Django 5.2.14 on 2026-10-19 07:52
+
+from datetime import timedelta
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, Q
+
+OPEN = 1
+
+
+def set_next_reminder_at(apps, schema_editor):
+    LeagueUserInvitation = apps.get_model("stave", "LeagueUserInvitation")
+
+    LeagueUserInvitation.objects.filter(~Q(status=OPEN)).update(next_reminder_at=None)
+    # Open invitations without a reminder keep the default, i.e. are due now.
+    LeagueUserInvitation.objects.filter(
+        status=OPEN, last_date_message_sent__isnull=False
+    ).update(next_reminder_at=F("last_date_message_sent") + timedelta(hours=72))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0071_schedulesnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leagueuserinvitation",
+            name="next_reminder_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, default=django.utils.timezone.now, null=True
+            ),
+        ),
+        migrations.RunPython(
+            set_next_reminder_at, migrations.RunPython.noop, elidable=True
+        ),
+    ]
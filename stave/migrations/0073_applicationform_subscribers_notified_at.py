@@ -0,0 +1,27 @@
+# Generated by Django 5.2.14 on 2026-10-19 07:54
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_existing_forms_notified(apps, schema_editor):
+    # Only forms listed from now on are announced to subscribers.
+    ApplicationForm = apps.get_model("stave", "ApplicationForm")
+    ApplicationForm.objects.update(subscribers_notified_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0072_leagueuserinvitation_next_reminder_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="applicationform",
+            name="subscribers_notified_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            mark_existing_forms_notified, migrations.RunPython.noop, elidable=True
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.14 on 2026-10-19 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0073_applicationform_subscribers_notified_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["form", "status"], name="application_form_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="application",
+            index=models.Index(
+                fields=["user", "status"], name="application_user_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="crewassignment",
+            index=models.Index(
+                fields=["user", "crew"], name="crewassignment_user_crew_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["status", "start_date"], name="event_status_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("sent", False), ("suppressed", False)),
+                fields=["priority", "created_at"],
+                name="message_outbox_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.14 on 2026-10-19 08:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_applications(apps, schema_editor):
+    Application = apps.get_model("stave", "Application")
+    ApplicationStatusCount = apps.get_model("stave", "ApplicationStatusCount")
+    ApplicationStatusCount.objects.bulk_create(
+        (
+            ApplicationStatusCount(**row)
+            for row in Application.objects.values("form_id", "status")
+            .annotate(count=Count("id"))
+            .order_by()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0074_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStatusCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(editable=False, primary_key=True, serialize=False),
+                ),
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[
+                            (1, "Applied"),
+                            (7, "Invitation Pending"),
+                            (2, "Invited"),
+                            (3, "Confirmed"),
+                            (4, "Declined"),
+                            (10, "Assignment Pending"),
+                            (8, "Assigned"),
+                            (9, "Rejection Pending"),
+                            (5, "Rejected"),
+                            (6, "Withdrawn"),
+                        ]
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_counts",
+                        to="stave.applicationform",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("form", "status"), name="one_count_per_form_and_status"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            count_existing_applications, migrations.RunPython.noop, elidable=True
+        ),
+    ]
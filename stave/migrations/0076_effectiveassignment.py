@@ -0,0 +1,28 @@
+# Generated by Django 5.2.14 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0075_applicationstatuscount"),
+    ]
+
+    # The view itself is created after every migrate run, and dropped before
+    # it, by stave.effective_assignments (see signals.py).
+    operations = [
+        migrations.CreateModel(
+            name="EffectiveAssignment",
+            fields=[
+                (
+                    "id",
+                    models.CharField(max_length=80, primary_key=True, serialize=False),
+                ),
+                ("is_override", models.BooleanField()),
+            ],
+            options={
+                "db_table": "stave_effectiveassignment",
+                "managed": False,
+            },
+        ),
+    ]
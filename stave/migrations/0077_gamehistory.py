@@ -0,0 +1,155 @@
+# Generated by Django 5.2.14 on 2026-10-19 08:25
+
+import uuid
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+COMPLETE = 4
+
+
+def record_completed_events(apps, schema_editor):
+    RoleGroupCrewAssignment = apps.get_model("stave", "RoleGroupCrewAssignment")
+    CrewAssignment = apps.get_model("stave", "CrewAssignment")
+    GameHistory = apps.get_model("stave", "GameHistory")
+
+    rgcas = list(
+        RoleGroupCrewAssignment.objects.filter(
+            game__event__status=COMPLETE
+        ).select_related("role_group")
+    )
+    crew_ids = {rgca.crew_id for rgca in rgcas} | {
+        rgca.crew_overrides_id for rgca in rgcas
+    }
+    assignments_by_crew = defaultdict(list)
+    for assignment in CrewAssignment.objects.filter(
+        crew_id__in=crew_ids - {None}
+    ).select_related("role"):
+        assignments_by_crew[assignment.crew_id].append(assignment)
+
+    roles = defaultdict(list)
+    head_officials = {}
+    for rgca in rgcas:
+        # Override assignments replace the static crew's, role by role.
+        effective_crew = {
+            assignment.role_id: assignment
+            for crew_id in (rgca.crew_id, rgca.crew_overrides_id)
+            for assignment in assignments_by_crew[crew_id]
+        }
+        for assignment in effective_crew.values():
+            roles[(rgca.game_id, rgca.role_group_id, assignment.user_id)].append(
+                assignment.role
+            )
+            head_officials[
+                (rgca.game_id, rgca.role_group.name, assignment.role.name)
+            ] = assignment.user_id
+
+    histories = []
+    for (game_id, role_group_id, user_id), user_roles in roles.items():
+        role = next((r for r in user_roles if r.nonexclusive), user_roles[0])
+        histories.append(
+            GameHistory(
+                user_id=user_id,
+                game_id=game_id,
+                role_group_id=role_group_id,
+                role=role,
+                secondary_role=next((r for r in user_roles if r != role), None),
+                head_referee_id=head_officials.get((game_id, "SO", "HR")),
+                head_nso_id=head_officials.get((game_id, "NSO", "HNSO")),
+            )
+        )
+    GameHistory.objects.bulk_create(histories, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stave", "0076_effectiveassignment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GameHistory",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "game",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="histories",
+                        to="stave.game",
+                    ),
+                ),
+                (
+                    "head_nso",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "head_referee",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "role",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="stave.role",
+                    ),
+                ),
+                (
+                    "role_group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="stave.rolegroup",
+                    ),
+                ),
+                (
+                    "secondary_role",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="stave.role",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="game_histories",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "game", "role_group"),
+                        name="one_history_per_game_and_role_group",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            record_completed_events, migrations.RunPython.noop, elidable=True
+        ),
+    ]
@@ -4,17 +4,23 @@ import enum
 import uuid
 import zoneinfo
 from collections import defaultdict
+from collections.abc import Iterable
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
 from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
 from django.db import models, transaction
-from django.db.models import Q, Prefetch
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q, Value
 from django.template.defaultfilters import slugify
 from django.urls import reverse
-from django.utils import formats
+from django.utils import formats, timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
+if TYPE_CHECKING:
+    from .avail import ScheduleEntry
+
 TIMEZONES_CHOICES = [(tz, tz) for tz in sorted(zoneinfo.available_timezones())]
 
 
@@ -91,9 +97,39 @@ class User(AbstractBaseUser):
     date_created = models.DateTimeField(auto_now_add=True)
 
     league_permissions: models.Manager["LeagueUserPermission"]
+    league_group_subscriptions: models.Manager["LeagueGroupSubscription"]
 
     objects = UserQuerySet.as_manager()
 
+    @cached_property
+    def league_grants(self) -> frozenset[tuple[uuid.UUID, int]]:
+        """This user's (league id, permission) grants, loaded once per instance.
+        Each request has its own request.user, so this is request-scoped."""
+        return frozenset(self.league_permissions.values_list("league_id", "permission"))
+
+    def has_league_permission(
+        self, league_id: uuid.UUID, permission: "UserPermission"
+    ) -> bool:
+        return (league_id, permission) in self.league_grants
+
+    @cached_property
+    def subscribed_league_ids(self) -> frozenset[uuid.UUID]:
+        """Leagues in this user's subscriptions group, cached like league_grants.
+        Doesn't create the group, so it takes no locks."""
+        return frozenset(
+            LeagueGroupMember.objects.filter(
+                group__owner=self, group__is_subscriptions_group=True
+            ).values_list("league_id", flat=True)
+        )
+
+    @cached_property
+    def subscribed_league_group_ids(self) -> frozenset[uuid.UUID]:
+        """League Groups this user subscribes to, other than their own
+        subscriptions group."""
+        return frozenset(
+            self.league_group_subscriptions.values_list("league_group_id", flat=True)
+        )
+
     # Required to use the Django Admin
     def has_perm(self, perm, obj=None):
         return True
@@ -198,6 +234,41 @@ class Role(models.Model):
         ordering = ["role_group", "order_key"]
 
 
+def holds_league_permission(
+    user: User | AnonymousUser | None,
+    permission: "UserPermission",
+    league_ref: str = "pk",
+) -> Exists | Q:
+    """A filter condition that holds where `user` has `permission` over the League
+    at `league_ref` on the outer query. Being a correlated EXISTS, it joins nothing
+    into the outer query and needs no DISTINCT."""
+    if not isinstance(user, User):
+        return Q(pk__in=[])
+
+    return Exists(
+        LeagueUserPermission.objects.filter(
+            user=user, permission=permission, league_id=OuterRef(league_ref)
+        )
+    )
+
+
+def grants_league_permission(
+    user: User, permission: "UserPermission", league_path: str = ""
+) -> Q:
+    """A filter condition that joins through the League at `league_path` to `user`'s
+    grant of `permission`. Grants are unique per user, league and permission, so
+    the join matches each row once and needs no DISTINCT, and it's cheaper than
+    holds_league_permission() as a queryset's only permission check. ORed with
+    other conditions, it would match every grant on the League instead."""
+    prefix = f"{league_path}__" if league_path else ""
+    return Q(
+        **{
+            f"{prefix}user_permissions__user": user,
+            f"{prefix}user_permissions__permission": permission,
+        }
+    )
+
+
 class LeagueQuerySet(models.QuerySet["League"]):
     def visible(self, user: User | AnonymousUser) -> models.QuerySet["League"]:
         if isinstance(user, User):
@@ -213,25 +284,41 @@ class LeagueQuerySet(models.QuerySet["League"]):
             return self.filter(enabled=True)
 
     def event_manageable(self, user: User) -> models.QuerySet["League"]:
-        return self.filter(
-            user_permissions__permission=UserPermission.EVENT_MANAGER,
-            user_permissions__user=user,
-        ).distinct()
+        return self.filter(grants_league_permission(user, UserPermission.EVENT_MANAGER))
 
     def manageable(self, user: User | AnonymousUser) -> models.QuerySet["League"]:
         if isinstance(user, AnonymousUser):
             return self.none()
 
         return self.filter(
-            user_permissions__permission=UserPermission.LEAGUE_MANAGER,
-            user_permissions__user=user,
-        ).distinct()
+            grants_league_permission(user, UserPermission.LEAGUE_MANAGER)
+        )
 
     def subscribed(self, user: User) -> models.QuerySet["League"]:
         return self.filter(
             league_groups__group__in=LeagueGroup.objects.subscribed(user)
         ).distinct()
 
+    def subscribers(self) -> models.QuerySet:
+        """(user id, email, league id) for each subscriber to each of these leagues,
+        through a League Group subscription or their own subscriptions group.
+        Duplicates are removed by the database's UNION."""
+        return (
+            LeagueGroupSubscription.objects.filter(
+                league_group__group_memberships__league__in=self
+            )
+            .values_list(
+                "user_id", "user__email", "league_group__group_memberships__league_id"
+            )
+            .union(
+                LeagueGroup.objects.filter(
+                    is_subscriptions_group=True, group_memberships__league__in=self
+                )
+                .order_by()
+                .values_list("owner_id", "owner__email", "group_memberships__league_id")
+            )
+        )
+
 
 def upload_to(instance: models.Model, filename: str) -> str:
     return f"{instance.id}/{filename}"
@@ -634,6 +721,10 @@ class CrewAssignment(models.Model):
             ),
             # models.CheckConstraint(condition=Q(role__in=F("crew__role_group__roles")), name="role_must_be_in_crews_rolegroup")
         ]
+        indexes = [
+            # A user's assignments, e.g. for staffing checks and their schedule.
+            models.Index(fields=["user", "crew"], name="crewassignment_user_crew_idx"),
+        ]
 
 
 class EventStatus(models.IntegerChoices):
@@ -697,9 +788,8 @@ class EventQuerySet(models.QuerySet["Event"]):
             return self.none()
 
         return self.filter(
-            league__user_permissions__permission=UserPermission.EVENT_MANAGER,
-            league__user_permissions__user=user,
-        ).distinct()
+            grants_league_permission(user, UserPermission.EVENT_MANAGER, "league")
+        )
 
     def open_applications_grouped_by_subscription(
         self, user: User | AnonymousUser
@@ -709,10 +799,7 @@ class EventQuerySet(models.QuerySet["Event"]):
                 id__in=ApplicationForm.objects.listed(user).values("event")
             )
             .select_related("league")
-            .prefetch_related(
-                "application_forms__role_groups",
-                "application_forms__event__league",
-            )
+            .prefetch_for_cards(user)
         )
 
         if user.is_authenticated:
@@ -731,6 +818,32 @@ class EventQuerySet(models.QuerySet["Event"]):
     def prefetch_for_display(self) -> models.QuerySet["Event"]:
         return self.select_related("league").prefetch_related("games")
 
+    def prefetch_for_cards(
+        self, user: User | AnonymousUser
+    ) -> models.QuerySet["Event"]:
+        """Annotate `is_user_staffed` and prefetch the forms listed for `user`
+        as `listed_forms`, so event cards don't query per card."""
+        if user.is_authenticated:
+            is_user_staffed = Exists(
+                Application.objects.filter(
+                    form__event=OuterRef("pk"),
+                    user=user,
+                    status=ApplicationStatus.ASSIGNED,
+                )
+            )
+        else:
+            is_user_staffed = Value(False)
+
+        return self.annotate(is_user_staffed=is_user_staffed).prefetch_related(
+            Prefetch(
+                "application_forms",
+                queryset=ApplicationForm.objects.listed(user).prefetch_related(
+                    "role_groups"
+                ),
+                to_attr="listed_forms",
+            )
+        )
+
     def staffing_for_user(self, user: User) -> models.QuerySet["Event"]:
         if not user.is_authenticated:
             return self.none()
@@ -803,16 +916,7 @@ class EventQuerySet(models.QuerySet["Event"]):
             "application_forms",
             "application_forms__role_groups",
             "application_forms__event__league",
-            Prefetch(
-                "application_forms__applications",
-                queryset=Application.objects.filter(status__in=OPEN_STATUSES),
-                to_attr="open_applications",
-            ),
-            Prefetch(
-                "application_forms__applications",
-                queryset=Application.objects.filter(status__in=PENDING_STATUSES),
-                to_attr="pending_applications",
-            ),
+            "application_forms__status_counts",
         )
 
 
@@ -843,6 +947,13 @@ class Event(models.Model):
 
     objects = EventQuerySet.as_manager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):  # type: ignore
+        instance = super().from_db(db, field_names, values)
+        # Lets signals.py tell when a save moves this Event out of COMPLETE.
+        instance.saved_status = instance.__dict__.get("status")
+        return instance
+
     def __str__(self) -> str:
         return self.name
 
@@ -856,6 +967,12 @@ class Event(models.Model):
                 fields=["league", "slug"], name="unique_slug_per_league"
             )
         ]
+        indexes = [
+            # Listings filter on status and sort by date.
+            models.Index(
+                fields=["status", "start_date"], name="event_status_start_idx"
+            ),
+        ]
 
     def days(self) -> list[str]:
         return [
@@ -943,9 +1060,36 @@ class GameQuerySet(models.QuerySet["Game"]):
             return self.none()
 
         return self.filter(
-            event__league__user_permissions__permission=UserPermission.EVENT_MANAGER,
-            event__league__user_permissions__user=user,
-        ).distinct()
+            grants_league_permission(
+                user, UserPermission.EVENT_MANAGER, "event__league"
+            )
+        )
+
+    def prefetch_effective_crews(self) -> models.QuerySet["Game"]:
+        """Prefetch what effective crews and head officials need, so that listing
+        Games with them takes a fixed number of queries."""
+        assignments = CrewAssignment.objects.select_related("user", "role")
+        return self.prefetch_related(
+            Prefetch(
+                "role_group_crew_assignments",
+                queryset=RoleGroupCrewAssignment.objects.select_related(
+                    "role_group", "crew", "crew_overrides"
+                ),
+            ),
+            Prefetch(
+                "role_group_crew_assignments__crew__assignments", queryset=assignments
+            ),
+            Prefetch(
+                "role_group_crew_assignments__crew_overrides__assignments",
+                queryset=assignments,
+            ),
+        )
+
+
+@dataclasses.dataclass
+class HeadOfficials:
+    hr: User | None
+    hnso: User | None
 
 
 class Game(models.Model):
@@ -988,13 +1132,24 @@ class Game(models.Model):
         """
         Returns the User for the given role group and role for the game.
         """
-        rga = self.role_group_crew_assignments.filter(
-            role_group__name=role_group
-        ).first()
-        if rga:
-            for ca in rga.effective_crew():
-                if ca.role.name == role:
-                    return ca.user
+        if "role_group_crew_assignments" not in getattr(
+            self, "_prefetched_objects_cache", {}
+        ):
+            assignment = (
+                EffectiveAssignment.objects.filter(
+                    game=self, role_group__name=role_group, role__name=role
+                )
+                .select_related("user")
+                .first()
+            )
+            return assignment.user if assignment else None
+
+        # Resolve from GameQuerySet.prefetch_effective_crews() without querying.
+        for rgca in self.role_group_crew_assignments.all():
+            if rgca.role_group.name == role_group:
+                for ca in rgca.effective_crew():
+                    if ca.role.name == role:
+                        return ca.user
         return None
 
     def hr(self) -> User | None:
@@ -1009,6 +1164,54 @@ class Game(models.Model):
         """
         return self.user_by_group_and_role("NSO", "HNSO")
 
+    def head_officials(self) -> HeadOfficials:
+        return HeadOfficials(hr=self.hr(), hnso=self.hnso())
+
+
+class EffectiveAssignment(models.Model):
+    """The CrewAssignment in effect for each role of each Game's role groups: the
+    override crew's, where it has one for the role, or else the static crew's.
+
+    This is a database view (see effective_assignments.py), so that e.g. a
+    user's games or a game's HR are single queries."""
+
+    id = models.CharField(primary_key=True, max_length=80)
+    role_group_crew_assignment = models.ForeignKey(
+        RoleGroupCrewAssignment,
+        related_name="effective_assignments",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    game = models.ForeignKey(
+        Game,
+        related_name="effective_assignments",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    role_group = models.ForeignKey(
+        RoleGroup, related_name="+", on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    role = models.ForeignKey(
+        Role, related_name="+", on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    user = models.ForeignKey(
+        User,
+        related_name="effective_assignments",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    crew_assignment = models.ForeignKey(
+        CrewAssignment,
+        related_name="+",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    is_override = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = "stave_effectiveassignment"
+
 
 class ApplicationStatus(models.IntegerChoices):
     APPLIED = 1, _("Applied")
@@ -1110,11 +1313,22 @@ class MessageTemplate(models.Model):
         ]
 
 
+class BuiltinMessageTemplate(models.TextChoices):
+    APPLICATION_RECEIVED = "application-received", _("Application Received")
+
+
+class MessagePriority(models.IntegerChoices):
+    # Lower values are sent first.
+    TRANSACTIONAL = 1, _("Transactional")
+    NORMAL = 2, _("Normal")
+    BULK = 3, _("Bulk")
+
+
 class Message(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    subject = models.CharField(max_length=256)
-    content_plain_text = models.TextField()
-    content_html = models.TextField()
+    subject = models.CharField(max_length=256, blank=True, default="")
+    content_plain_text = models.TextField(blank=True, default="")
+    content_html = models.TextField(blank=True, default="")
     user = models.ForeignKey(
         User, related_name="messages", on_delete=models.CASCADE, blank=True, null=True
     )
@@ -1123,6 +1337,94 @@ class Message(models.Model):
     sent_date = models.DateTimeField(null=True)
     tries = models.IntegerField(default=0)
     reply_to = models.CharField(max_length=256, null=True, blank=True)
+    priority = models.IntegerField(
+        choices=MessagePriority.choices, default=MessagePriority.NORMAL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Deferred messages store a template and context instead of rendered
+    # content, and are rendered by the outbox worker at send time.
+    template = models.ForeignKey(
+        MessageTemplate,
+        related_name="messages",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+    )
+    builtin_template = models.CharField(
+        max_length=64, choices=BuiltinMessageTemplate.choices, blank=True, null=True
+    )
+    application = models.ForeignKey(
+        "Application",
+        related_name="messages",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    sender = models.ForeignKey(
+        User, related_name="+", on_delete=models.SET_NULL, blank=True, null=True
+    )
+    language = models.CharField(max_length=16, blank=True, null=True)
+    # Set instead of sending when the recipient is on the suppression list.
+    suppressed = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # The outbox: only unsent Messages, in the order jobs.pending_messages
+            # takes them. Sent Messages, the bulk of the table, stay out of it.
+            models.Index(
+                fields=["priority", "created_at"],
+                condition=Q(sent=False, suppressed=False),
+                name="message_outbox_idx",
+            ),
+        ]
+
+    @property
+    def recipient(self) -> str:
+        return self.user.email if self.user else self.email
+
+    @property
+    def deferred(self) -> bool:
+        return self.application_id is not None and not self.content_html
+
+
+class EmailSuppressionReason(models.TextChoices):
+    BOUNCE = "bounce", _("Bounce")
+    COMPLAINT = "complaint", _("Complaint")
+    MANUAL = "manual", _("Manual")
+
+
+class EmailSuppression(models.Model):
+    """An address we must not send to. Addresses are stored lowercased."""
+
+    email = models.CharField(max_length=256, unique=True)
+    reason = models.CharField(max_length=16, choices=EmailSuppressionReason.choices)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.email
+
+    def save(self, *args, **kwargs):
+        self.email = self.email.lower()
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def suppressed(cls, emails: Iterable[str]) -> set[str]:
+        """The lowercased members of `emails` that are suppressed."""
+        return set(
+            cls.objects.filter(
+                email__in={email.lower() for email in emails if email}
+            ).values_list("email", flat=True)
+        )
+
+
+class SendRateLimit(models.Model):
+    """Token bucket state for outbox delivery, shared by all worker processes."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    tokens = models.FloatField()
+    rate = models.FloatField()
+    updated_at = models.DateTimeField()
 
 
 # Application models
@@ -1139,6 +1441,90 @@ class ApplicationKind(models.IntegerChoices):
     CONFIRM_THEN_ASSIGN = 2, _("Confirm then Assign")
 
 
+# Legal Application status changes by form kind and current status, for the
+# applicant and for an event manager. See Application.get_legal_state_changes().
+StatusChanges = dict[ApplicationStatus, tuple[ApplicationStatus, ...]]
+
+APPLICANT_STATUS_CHANGES: dict[ApplicationKind, StatusChanges] = {
+    ApplicationKind.CONFIRM_THEN_ASSIGN: {
+        ApplicationStatus.APPLIED: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.INVITATION_PENDING: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.INVITED: (
+            ApplicationStatus.CONFIRMED,
+            ApplicationStatus.DECLINED,
+            ApplicationStatus.WITHDRAWN,
+        ),
+        ApplicationStatus.REJECTION_PENDING: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.ASSIGNMENT_PENDING: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.CONFIRMED: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.ASSIGNED: (ApplicationStatus.WITHDRAWN,),
+    },
+    ApplicationKind.ASSIGN_ONLY: {
+        ApplicationStatus.APPLIED: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.REJECTION_PENDING: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.ASSIGNMENT_PENDING: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.ASSIGNED: (ApplicationStatus.WITHDRAWN,),
+    },
+}
+
+MANAGER_STATUS_CHANGES: dict[ApplicationKind, StatusChanges] = {
+    ApplicationKind.CONFIRM_THEN_ASSIGN: {
+        ApplicationStatus.APPLIED: (
+            ApplicationStatus.INVITATION_PENDING,
+            ApplicationStatus.INVITED,
+            ApplicationStatus.REJECTION_PENDING,
+            ApplicationStatus.REJECTED,
+            ApplicationStatus.WITHDRAWN,
+        ),
+        ApplicationStatus.INVITATION_PENDING: (
+            ApplicationStatus.APPLIED,
+            ApplicationStatus.INVITED,
+            ApplicationStatus.CONFIRMED,
+            ApplicationStatus.DECLINED,
+            ApplicationStatus.WITHDRAWN,
+        ),
+        ApplicationStatus.INVITED: (
+            ApplicationStatus.CONFIRMED,
+            ApplicationStatus.DECLINED,
+            ApplicationStatus.WITHDRAWN,
+        ),
+        ApplicationStatus.REJECTION_PENDING: (
+            ApplicationStatus.APPLIED,
+            ApplicationStatus.REJECTED,
+        ),
+        ApplicationStatus.ASSIGNMENT_PENDING: (
+            ApplicationStatus.WITHDRAWN,
+            ApplicationStatus.ASSIGNED,
+        ),
+        ApplicationStatus.CONFIRMED: (ApplicationStatus.WITHDRAWN,),
+        ApplicationStatus.ASSIGNED: (ApplicationStatus.WITHDRAWN,),
+    },
+    ApplicationKind.ASSIGN_ONLY: {
+        ApplicationStatus.APPLIED: (
+            ApplicationStatus.REJECTION_PENDING,
+            ApplicationStatus.REJECTED,
+            ApplicationStatus.WITHDRAWN,
+        ),
+        ApplicationStatus.REJECTION_PENDING: (
+            ApplicationStatus.APPLIED,
+            ApplicationStatus.WITHDRAWN,
+        ),
+        ApplicationStatus.ASSIGNMENT_PENDING: (
+            ApplicationStatus.ASSIGNED,
+            ApplicationStatus.WITHDRAWN,
+        ),
+        ApplicationStatus.ASSIGNED: (ApplicationStatus.WITHDRAWN,),
+    },
+}
+
+# Statuses that release an applicant from any crews they'd been assigned to.
+RELEASED_STATUSES = (
+    ApplicationStatus.WITHDRAWN,
+    ApplicationStatus.REJECTED,
+    ApplicationStatus.DECLINED,
+)
+
+
 class ApplicationAvailabilityKind(models.IntegerChoices):
     WHOLE_EVENT = 1, _("Entire Event")
     BY_DAY = 2, _("By Day")
@@ -1344,39 +1730,50 @@ class ApplicationFormTemplateAssignment(models.Model):
 
 
 class ApplicationFormQuerySet(models.QuerySet["ApplicationForm"]):
-    def listed(self, user: User | AnonymousUser) -> models.QuerySet["ApplicationForm"]:
+    def listed(
+        self, user: User | AnonymousUser | None
+    ) -> models.QuerySet["ApplicationForm"]:
         """ApplicationForms that are listed on the homepage and other timelines"""
-        return (
-            self.manageable(user)
-            | self.filter(
+        return self.filter(
+            Q(
                 closed=False,
                 hidden=False,
                 event__status=EventStatus.OPEN,
                 event__league__enabled=True,
-            ).distinct()
+            )
+            | self._manageable_condition(user)
         ).order_by("close_date", "event__start_date")  # TODO: make this a CASE()
 
     def subscribed(self, user: User) -> models.QuerySet["ApplicationForm"]:
         return self.filter(event__in=Event.objects.subscribed(user))
 
+    def awaiting_subscriber_notification(
+        self,
+    ) -> models.QuerySet["ApplicationForm"]:
+        """Publicly listed ApplicationForms whose leagues' subscribers haven't
+        been notified yet"""
+        return self.listed(None).filter(subscribers_notified_at__isnull=True)
+
     def accessible(
         self, user: User | AnonymousUser
     ) -> models.QuerySet["ApplicationForm"]:
         """ApplicationForms that can be accessed by a user who knows the URL"""
         return self.filter(
-            event__league__enabled=True,
-        ).exclude(event__status=EventStatus.DRAFTING).distinct() | self.manageable(user)
+            (Q(event__league__enabled=True) & ~Q(event__status=EventStatus.DRAFTING))
+            | self._manageable_condition(user)
+        )
 
     def submittable(
         self, user: User | AnonymousUser
     ) -> models.QuerySet["ApplicationForm"]:
-        return (
-            self.filter(
+        return self.filter(
+            Q(
                 event__status__in=[EventStatus.OPEN, EventStatus.LINK_ONLY],
                 event__league__enabled=True,
-            ).distinct()
-            | self.manageable(user)
-        ).exclude(closed=True)
+            )
+            | self._manageable_condition(user),
+            closed=False,
+        )
 
     def manageable(
         self, user: User | AnonymousUser
@@ -1384,14 +1781,20 @@ class ApplicationFormQuerySet(models.QuerySet["ApplicationForm"]):
         if isinstance(user, AnonymousUser):
             return self.none()
         else:
-            return (
-                self.filter(
-                    event__league__user_permissions__permission=UserPermission.EVENT_MANAGER,
-                    event__league__user_permissions__user=user,
+            return self.filter(
+                grants_league_permission(
+                    user, UserPermission.EVENT_MANAGER, "event__league"
                 )
-                .distinct()
-                .exclude(event__status__in=[EventStatus.CANCELED, EventStatus.COMPLETE])
+            ).exclude(event__status__in=[EventStatus.CANCELED, EventStatus.COMPLETE])
+
+    @staticmethod
+    def _manageable_condition(user: User | AnonymousUser | None) -> Q:
+        # EXISTS rather than a join, as callers OR this with other conditions.
+        return Q(
+            holds_league_permission(
+                user, UserPermission.EVENT_MANAGER, "event__league_id"
             )
+        ) & ~Q(event__status__in=[EventStatus.CANCELED, EventStatus.COMPLETE])
 
     def prefetch_applications(self) -> models.QuerySet["ApplicationForm"]:
         return self.select_related(
@@ -1419,6 +1822,7 @@ class ApplicationFormQuerySet(models.QuerySet["ApplicationForm"]):
 class SendEmailContextType(enum.Enum):
     INVITATION = "invitation"
     SCHEDULE = "schedule"
+    SCHEDULE_UPDATE = "schedule-update"
     REJECTION = "rejection"
     CREW = "crew"
 
@@ -1483,6 +1887,9 @@ class ApplicationForm(models.Model):
             "You can accept standard fields from the user's profile without requiring them to re-type their information. You always receive the Derby Name field."
         ),
     )
+    subscribers_notified_at = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
     objects = ApplicationFormQuerySet().as_manager()
     invitation_email_template = models.ForeignKey(
         MessageTemplate,
@@ -1511,7 +1918,24 @@ class ApplicationForm(models.Model):
 
     @property
     def editable(self) -> bool:
-        return not self.applications.exists()
+        return not self.count_applications()
+
+    def count_applications(self, statuses: Iterable[int] | None = None) -> int:
+        """The number of Applications to this form, optionally only those in
+        `statuses`, read from the maintained ApplicationStatusCounts."""
+        return sum(
+            status_count.count
+            for status_count in self.status_counts.all()
+            if statuses is None or status_count.status in statuses
+        )
+
+    @property
+    def open_application_count(self) -> int:
+        return self.count_applications(OPEN_STATUSES)
+
+    @property
+    def pending_application_count(self) -> int:
+        return self.count_applications(PENDING_STATUSES)
 
     def event_crews(self) -> models.QuerySet[Crew]:
         return self.event.event_crews().filter(role_group__in=self.role_groups.all())
@@ -1592,13 +2016,15 @@ class ApplicationForm(models.Model):
         match context:
             case SendEmailContextType.INVITATION:
                 return self.invitation_email_template
-            case SendEmailContextType.SCHEDULE:
+            case SendEmailContextType.SCHEDULE | SendEmailContextType.SCHEDULE_UPDATE:
                 return self.schedule_email_template
             case SendEmailContextType.REJECTION:
                 return self.rejection_email_template
 
     def get_user_queryset_for_context_type(
-        self, context: SendEmailContextType
+        self,
+        context: SendEmailContextType,
+        schedules: dict[uuid.UUID, list["ScheduleEntry"]] | None = None,
     ) -> models.QuerySet[User]:
         match context:
             case SendEmailContextType.INVITATION:
@@ -1616,6 +2042,28 @@ class ApplicationForm(models.Model):
                         status=ApplicationStatus.ASSIGNMENT_PENDING
                     ).values("user_id")
                 ).distinct()
+            case SendEmailContextType.SCHEDULE_UPDATE:
+                # Pending assignments, plus assigned users whose effective
+                # assignments changed since their last schedule email.
+                from .avail import schedule_changes
+
+                changes = schedule_changes(
+                    self,
+                    self.applications.filter(status=ApplicationStatus.ASSIGNED),
+                    schedules,
+                )
+                return User.objects.filter(
+                    id__in=self.applications.filter(
+                        Q(status=ApplicationStatus.ASSIGNMENT_PENDING)
+                        | Q(
+                            id__in=[
+                                application_id
+                                for application_id, change in changes.items()
+                                if change
+                            ]
+                        )
+                    ).values("user_id")
+                ).distinct()
             case SendEmailContextType.REJECTION:
                 return User.objects.filter(
                     id__in=self.applications.filter(
@@ -1709,6 +2157,69 @@ class ApplicationQuerySet(models.QuerySet["Application"]):
             ),
         ).distinct()
 
+    def transition(
+        self, user: User, status: ApplicationStatus, batch_size: int = 500
+    ) -> list["Application"]:
+        """Move each of these Applications that `user` may legally move to `status`
+        there, in bulk. Returns the Applications that changed.
+
+        Follows ApplicationStatusView's rules: an Application confirmed while
+        its applicant is already on a crew goes to Assignment Pending instead,
+        and released applicants are removed from their crews."""
+        applications = [
+            application
+            for application in self.select_related("form__event").prefetch_related(
+                "roles"
+            )
+            if status != application.status
+            and status in application.get_legal_state_changes(user)
+        ]
+        if not applications:
+            return []
+
+        for application in applications:
+            application.status = status
+
+        if status == ApplicationStatus.CONFIRMED:
+            assigned = set(
+                CrewAssignment.objects.filter(
+                    user_id__in={a.user_id for a in applications},
+                    crew__event_id__in={a.form.event_id for a in applications},
+                    role__in={role for a in applications for role in a.roles.all()},
+                ).values_list("user_id", "crew__event_id", "role_id")
+            )
+            for application in applications:
+                if application.form.application_kind == (
+                    ApplicationKind.CONFIRM_THEN_ASSIGN
+                ) and any(
+                    (application.user_id, application.form.event_id, role.id)
+                    in assigned
+                    for role in application.roles.all()
+                ):
+                    application.status = ApplicationStatus.ASSIGNMENT_PENDING
+
+        with transaction.atomic():
+            Application.objects.bulk_update(
+                applications, ["status"], batch_size=batch_size
+            )
+            if status in RELEASED_STATUSES:
+                # As Application.save() does, but as one DELETE.
+                released = Q(pk__in=[])
+                for form in {a.form for a in applications}:
+                    released |= Q(
+                        user_id__in={a.user_id for a in applications if a.form == form},
+                        crew__event_id=form.event_id,
+                        role__role_group__in=form.role_groups.all(),
+                    )
+                CrewAssignment.objects.filter(released).delete()
+
+            ApplicationStatusCount.objects.refresh({a.form_id for a in applications})
+
+        for application in applications:
+            application.saved_status = application.status
+
+        return applications
+
     def prefetch_for_display(self) -> models.QuerySet["Application"]:
         return self.select_related(
             "form", "form__event", "form__event__league"
@@ -1807,9 +2318,21 @@ class Application(models.Model):
 
     objects = ApplicationQuerySet.as_manager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):  # type: ignore
+        instance = super().from_db(db, field_names, values)
+        # Lets signals.py move this Application between status counts on save.
+        instance.saved_status = instance.__dict__.get("status")
+        return instance
+
     class Meta:
         # TODO: require population of the relevant availability type for the form.
-        pass
+        indexes = [
+            # A form's applications by status: staffing views and email sends.
+            models.Index(fields=["form", "status"], name="application_form_status_idx"),
+            # A user's applications by status: profiles and staffing checks.
+            models.Index(fields=["user", "status"], name="application_user_status_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.form}: {self.user}"
@@ -1837,142 +2360,62 @@ class Application(models.Model):
             user=self.user, crew__event=self.form.event, role__in=self.roles.all()
         ).exists()
 
-    def save(self, *args, **kwargs):
-        if self.status in [
-            ApplicationStatus.WITHDRAWN,
-            ApplicationStatus.REJECTED,
-            ApplicationStatus.DECLINED,
-        ]:
-            # Remove all CrewAssignments for this user that correspond
-            # to this application's form's Role Groups.
-            CrewAssignment.objects.filter(
-                user=self.user,
-                crew__event=self.form.event,
-                role__role_group__in=self.form.role_groups.all(),
-            ).delete()
+    def lock_saved_status(self):
+        """Lock this Application's row until the transaction ends and re-read the
+        status it's saved with, which a concurrent save may have changed since
+        this instance was loaded."""
+        self.saved_status = (
+            Application.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("status", flat=True)
+            .first()
+        )
 
-        return super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            # The status counts (see signals.py) move this Application from its
+            # saved status, so that has to be the one in the database.
+            if not self._state.adding and (
+                update_fields is None or "status" in update_fields
+            ):
+                self.lock_saved_status()
+
+            if self.status in RELEASED_STATUSES and self.status != getattr(
+                self, "saved_status", None
+            ):
+                # Remove all CrewAssignments for this user that correspond
+                # to this application's form's Role Groups.
+                CrewAssignment.objects.filter(
+                    user=self.user,
+                    crew__event=self.form.event,
+                    role__role_group__in=self.form.role_groups.all(),
+                ).delete()
+
+            return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self.lock_saved_status()
+            return super().delete(*args, **kwargs)
 
     def get_legal_state_changes(self, user: User) -> list[ApplicationStatus]:
-        states = list()
-        can_manage = (
-            Event.objects.manageable(user).filter(id=self.form.event_id).exists()
-        )
-
-        if self.form.application_kind == ApplicationKind.CONFIRM_THEN_ASSIGN:
-            match self.status:
-                case ApplicationStatus.APPLIED:
-                    if user == self.user:
-                        states.extend(
-                            [
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                    if can_manage:
-                        states.extend(
-                            [
-                                ApplicationStatus.INVITATION_PENDING,
-                                ApplicationStatus.INVITED,
-                                ApplicationStatus.REJECTION_PENDING,
-                                ApplicationStatus.REJECTED,
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                case ApplicationStatus.INVITATION_PENDING:
-                    if user == self.user:
-                        states.extend(
-                            [
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                    if can_manage:
-                        states.extend(
-                            [
-                                ApplicationStatus.APPLIED,
-                                ApplicationStatus.INVITED,
-                                ApplicationStatus.CONFIRMED,
-                                ApplicationStatus.DECLINED,
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                case ApplicationStatus.INVITED:
-                    if can_manage or user == self.user:
-                        states.extend(
-                            [
-                                ApplicationStatus.CONFIRMED,
-                                ApplicationStatus.DECLINED,
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                case ApplicationStatus.DECLINED:
-                    pass
-                case ApplicationStatus.REJECTION_PENDING:
-                    if user == self.user:
-                        states.extend(
-                            [
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                    if can_manage:
-                        states.extend(
-                            [ApplicationStatus.APPLIED, ApplicationStatus.REJECTED]
-                        )
-                case ApplicationStatus.REJECTED:
-                    pass
-                case ApplicationStatus.ASSIGNMENT_PENDING:
-                    if can_manage:
-                        states.extend(
-                            [ApplicationStatus.WITHDRAWN, ApplicationStatus.ASSIGNED]
-                        )
-                    if user == self.user:
-                        states.extend(
-                            [
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                case ApplicationStatus.CONFIRMED | ApplicationStatus.ASSIGNED:
-                    if can_manage or user == self.user:
-                        states.extend(
-                            [
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                case ApplicationStatus.WITHDRAWN:
-                    pass
-        else:
-            match self.status:
-                case ApplicationStatus.APPLIED:
-                    if user == self.user:
-                        states.extend([ApplicationStatus.WITHDRAWN])
-                    if can_manage:
-                        states.extend(
-                            [
-                                ApplicationStatus.REJECTION_PENDING,
-                                ApplicationStatus.REJECTED,
-                                ApplicationStatus.WITHDRAWN,
-                            ]
-                        )
-                case ApplicationStatus.REJECTION_PENDING:
-                    if user == self.user:
-                        states.extend([ApplicationStatus.WITHDRAWN])
-                    if can_manage:
-                        states.extend(
-                            [ApplicationStatus.APPLIED, ApplicationStatus.WITHDRAWN]
-                        )
-                case ApplicationStatus.ASSIGNMENT_PENDING:
-                    if user == self.user:
-                        states.extend([ApplicationStatus.WITHDRAWN])
-                    if can_manage:
-                        states.extend(
-                            [ApplicationStatus.ASSIGNED, ApplicationStatus.WITHDRAWN]
-                        )
-                case ApplicationStatus.ASSIGNED:
-                    if user == self.user or can_manage:
-                        states.extend([ApplicationStatus.WITHDRAWN])
-                case ApplicationStatus.WITHDRAWN:
-                    pass
+        states = []
+        if user.pk == self.user_id:
+            states.extend(
+                APPLICANT_STATUS_CHANGES[self.form.application_kind].get(
+                    self.status, ()
+                )
+            )
+        if isinstance(user, User) and user.has_league_permission(
+            self.form.event.league_id, UserPermission.EVENT_MANAGER
+        ):
+            states.extend(
+                MANAGER_STATUS_CHANGES[self.form.application_kind].get(self.status, ())
+            )
 
-        return states
+        # An event manager applying to their own form may have both lists.
+        return list(dict.fromkeys(states))
 
 
 class ApplicationResponse(models.Model):
@@ -2027,6 +2470,65 @@ class ApplicationResponse(models.Model):
         ]
 
 
+class ApplicationStatusCountQuerySet(models.QuerySet["ApplicationStatusCount"]):
+    def adjust(self, form_id: uuid.UUID, status: int, delta: int):
+        with transaction.atomic():
+            self.bulk_create(
+                [ApplicationStatusCount(form_id=form_id, status=status)],
+                ignore_conflicts=True,
+            )
+            self.filter(form_id=form_id, status=status).update(count=F("count") + delta)
+
+    def refresh(self, form_ids: Iterable[uuid.UUID]):
+        """Recount from the Applications themselves, for changes that bypass
+        Application.save() and delete(), such as QuerySet.update()."""
+        form_ids = list(form_ids)
+        with transaction.atomic():
+            self.filter(form_id__in=form_ids).delete()
+            self.bulk_create(
+                ApplicationStatusCount(**row)
+                for row in Application.objects.filter(form_id__in=form_ids)
+                .values("form_id", "status")
+                .annotate(count=Count("id"))
+                .order_by()
+            )
+
+
+class ApplicationStatusCount(models.Model):
+    """How many Applications to a form are in a status, maintained on Application
+    save and delete (see signals.py) so dashboards needn't load the rows."""
+
+    id = models.AutoField(primary_key=True, editable=False)
+    form = models.ForeignKey(
+        ApplicationForm, related_name="status_counts", on_delete=models.CASCADE
+    )
+    status = models.IntegerField(choices=ApplicationStatus.choices)
+    count = models.IntegerField(default=0)
+
+    objects = ApplicationStatusCountQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form", "status"], name="one_count_per_form_and_status"
+            )
+        ]
+
+
+class ScheduleSnapshot(models.Model):
+    """The effective assignments an applicant was sent in their last schedule
+    email, used to find who's affected by later roster changes."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    application = models.OneToOneField(
+        Application, related_name="schedule_snapshot", on_delete=models.CASCADE
+    )
+    entries: models.JSONField[list[dict[str, str]]] = models.JSONField(
+        default=list, blank=True
+    )
+    sent_at = models.DateTimeField(auto_now=True)
+
+
 class LeagueGroupQuerySet(models.QuerySet["LeagueGroup"]):
     def visible(self, user: User | AnonymousUser) -> "LeagueGroupQuerySet":
         # Note that this deliberately excludes the user's subscription group.
@@ -2060,6 +2562,8 @@ class LeagueGroup(models.Model):
 
     @classmethod
     def get_subscriptions_group_for_user(cls, user: User) -> "LeagueGroup":
+        # This locks the User row. Use it only when changing subscriptions;
+        # read paths use User.subscribed_league_ids.
         with transaction.atomic():
             user = User.objects.filter(id=user.id).select_for_update().first()
             group, _ = cls.objects.get_or_create(
@@ -2136,6 +2640,11 @@ class LeagueUserInvitation(models.Model):
     permissions = models.JSONField(default=list)
     expiration_date = models.DateTimeField()
     last_date_message_sent = models.DateTimeField(null=True, blank=True)
+    # When the reminder job should next email this invitation. New invitations
+    # are due immediately; closed ones are never due.
+    next_reminder_at = models.DateTimeField(
+        null=True, blank=True, default=timezone.now, db_index=True
+    )
     status = models.IntegerField(
         choices=LeagueUserInvitationStatus.choices,
         default=LeagueUserInvitationStatus.OPEN,
@@ -2144,18 +2653,86 @@ class LeagueUserInvitation(models.Model):
     def __str__(self):
         return f"Invitation to {self.email}"
 
+    def save(self, *args, **kwargs):
+        if self.status != LeagueUserInvitationStatus.OPEN:
+            self.next_reminder_at = None
+        super().save(*args, **kwargs)
+
+
+class GameHistoryQuerySet(models.QuerySet["GameHistory"]):
+    def record(self, events: Iterable[Event | uuid.UUID]):
+        """Rebuild the GameHistory of every official who worked the Games of `events`,
+        from their effective crews."""
+        games = Game.objects.filter(event__in=events).prefetch_effective_crews()
+
+        histories = []
+        for game in games:
+            head_officials = game.head_officials()
+            for rgca in game.role_group_crew_assignments.all():
+                roles_by_user: dict[uuid.UUID, list[Role]] = defaultdict(list)
+                for assignment in rgca.effective_crew():
+                    roles_by_user[assignment.user_id].append(assignment.role)
+
+                for user_id, roles in roles_by_user.items():
+                    # A user can have up to two roles in a game. Primary role is the
+                    # one with `nonexclusive=True`.
+                    role = next((r for r in roles if r.nonexclusive), roles[0])
+                    histories.append(
+                        GameHistory(
+                            user_id=user_id,
+                            game=game,
+                            role_group_id=rgca.role_group_id,
+                            role=role,
+                            secondary_role=next((r for r in roles if r != role), None),
+                            head_referee=head_officials.hr,
+                            head_nso=head_officials.hnso,
+                        )
+                    )
 
-class GameHistory:
-    game: Game
-    user: User
-    role: Role
-    secondary_role: Role | None
-
-    def __init__(self, game: Game, user: User, role: Role, secondary_role: Role | None):
-        self.game = game
-        self.user = user
-        self.role = role
-        self.secondary_role = secondary_role
+        with transaction.atomic():
+            self.filter(game__event__in=events).delete()
+            self.bulk_create(histories, batch_size=500)
+
+    def prefetch_for_display(self) -> models.QuerySet["GameHistory"]:
+        return self.select_related(
+            "game__event__league",
+            "role",
+            "secondary_role",
+            "head_referee",
+            "head_nso",
+        ).prefetch_related("game__event__games")
+
+
+class GameHistory(models.Model):
+    """A game an official worked, and in what roles, recorded when its Event is
+    complete so that a user's officiating history is a plain paginated list."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, related_name="game_histories", on_delete=models.CASCADE
+    )
+    game = models.ForeignKey(Game, related_name="histories", on_delete=models.CASCADE)
+    role_group = models.ForeignKey(RoleGroup, on_delete=models.CASCADE)
+    role = models.ForeignKey(Role, related_name="+", on_delete=models.CASCADE)
+    secondary_role = models.ForeignKey(
+        Role, related_name="+", null=True, on_delete=models.SET_NULL
+    )
+    head_referee = models.ForeignKey(
+        User, related_name="+", null=True, on_delete=models.SET_NULL
+    )
+    head_nso = models.ForeignKey(
+        User, related_name="+", null=True, on_delete=models.SET_NULL
+    )
+
+    objects = GameHistoryQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "game", "role_group"],
+                name="one_history_per_game_and_role_group",
+            )
+        ]
 
 
 @dataclasses.dataclass
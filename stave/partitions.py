@@ -0,0 +1,105 @@
+"""Weekly range partitioning of the Message outbox on PostgreSQL.
+
+Message is partitioned by the week of `created_at` (see migration 0070), so
+retention is a matter of dropping whole partitions rather than deleting rows,
+except in the rare weeks that still hold unsent Messages. Other databases keep
+a plain table and fall back to DELETE."""
+
+from datetime import datetime, time, timedelta, timezone
+
+import logging
+
+from django.db import DatabaseError, connection
+
+MESSAGE_TABLE = "stave_message"
+WEEK = timedelta(weeks=1)
+# Messages that have outlived retention, as jobs.delete_old_messages deletes
+# them on other databases. Messages that were never sent are kept.
+EXPIRED = (
+    "COALESCE((sent AND sent_date <= %(cutoff)s)"
+    " OR (suppressed AND created_at <= %(cutoff)s), FALSE)"
+)
+
+
+def enabled() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def week_start(moment: datetime) -> datetime:
+    """Midnight UTC on the Monday of the week containing `moment`."""
+    day = moment.astimezone(timezone.utc).date()
+    return datetime.combine(day - timedelta(days=day.weekday()), time(), timezone.utc)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{MESSAGE_TABLE}_w{start:%Y%m%d}"
+
+
+def create_partition(cursor, start: datetime):
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} "
+        f"PARTITION OF {MESSAGE_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{(start + WEEK).isoformat()}')"
+    )
+
+
+def partitions(cursor) -> dict[str, datetime]:
+    """Weekly partitions of the Message table, by name, with their start."""
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = %s",
+        [MESSAGE_TABLE],
+    )
+    weekly = {}
+    prefix = f"{MESSAGE_TABLE}_w"
+    for (name,) in cursor.fetchall():
+        if name.startswith(prefix):
+            weekly[name] = datetime.strptime(
+                name.removeprefix(prefix), "%Y%m%d"
+            ).replace(tzinfo=timezone.utc)
+
+    return weekly
+
+
+def ensure_partitions(weeks_ahead: int = 4, now: datetime | None = None):
+    """Create partitions for this week and the next `weeks_ahead` weeks, so
+    new Messages never land in the default partition."""
+    start = week_start(now or datetime.now(tz=timezone.utc))
+    with connection.cursor() as cursor:
+        for week in range(weeks_ahead + 1):
+            try:
+                create_partition(cursor, start + week * WEEK)
+            except DatabaseError as e:
+                # Most likely the default partition already holds rows for
+                # this week; they're deleted once they expire.
+                logging.getLogger().error(f"Could not create Message partition: {e}")
+
+
+def drop_expired_partitions(
+    retention: timedelta, now: datetime | None = None
+) -> list[str]:
+    """Drop every weekly partition that ended more than `retention` ago and
+    holds only expired Messages, and delete expired Messages from the default
+    partition and from old partitions that still hold unsent ones. Returns the
+    names of the dropped partitions."""
+    params = {"cutoff": (now or datetime.now(tz=timezone.utc)) - retention}
+    dropped = []
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {MESSAGE_TABLE}_default WHERE {EXPIRED}", params)
+        for name, start in sorted(partitions(cursor).items()):
+            if start + WEEK > params["cutoff"]:
+                continue
+
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {name} WHERE NOT {EXPIRED})", params
+            )
+            (unexpired,) = cursor.fetchone()
+            if unexpired:
+                cursor.execute(f"DELETE FROM {name} WHERE {EXPIRED}", params)
+            else:
+                cursor.execute(f"DROP TABLE {name}")
+                dropped.append(name)
+
+    return dropped
@@ -220,14 +220,56 @@ ACCOUNT_DEFAULT_HTTP_PROTOCOL = "https"
 LOGIN_REDIRECT_URL = "/"
 
 # Email settings
-EMAIL_BACKEND = os.environ.get(
+# All mail, including allauth and Django system mail, is queued in the Message
+# outbox and delivered by the send_emails job via STAVE_EMAIL_DELIVERY_BACKEND.
+EMAIL_BACKEND = "stave.mail.OutboxEmailBackend"
+STAVE_EMAIL_DELIVERY_BACKEND = os.environ.get(
     "EMAIL_BACKEND", "anymail.backends.amazon_ses.EmailBackend"
 )
 DEFAULT_FROM_EMAIL = "stave@stave.app"
+ANYMAIL = {}
+# The bounce and complaint tracking webhooks are only served when this is set.
+if webhook_secret := os.environ.get("ANYMAIL_WEBHOOK_SECRET"):  # pragma: no cover
+    ANYMAIL["WEBHOOK_SECRET"] = webhook_secret
 SERVER_EMAIL = "stave@stave.app"
 
 # Custom app settings
 STAVE_EMAIL_MAX_TRIES = 3
+# Messages are kept for this long. On Postgres, weekly Message partitions are
+# dropped once everything in them is older than this. Unsent Messages older
+# than this are no longer retried; they're logged and marked failed.
+STAVE_EMAIL_RETENTION_DAYS = 7
+# Store template references on outgoing Messages and render them in the
+# outbox worker, rather than rendering inside the request. Off by default:
+# turning it on moves rendering, including application acknowledgements, to
+# the worker, so mail waits for it to run.
+STAVE_EMAIL_DEFER_RENDERING = bool(os.environ.get("STAVE_EMAIL_DEFER_RENDERING"))
+# Hold non-transactional mail for this many minutes and send everything
+# pending for the same recipient as one digest email. 0 disables digests.
+STAVE_EMAIL_DIGEST_MINUTES = int(os.environ.get("STAVE_EMAIL_DIGEST_MINUTES", 0))
+# Provider send quota, in messages per second (SES's default production
+# quota is 14). The outbox backs off adaptively when throttled, down to
+# STAVE_EMAIL_MIN_SEND_RATE, and recovers by STAVE_EMAIL_SEND_RATE_RECOVERY
+# messages per second, per second. Set STAVE_EMAIL_SEND_RATE to 0 to disable.
+STAVE_EMAIL_SEND_RATE = float(os.environ.get("STAVE_EMAIL_SEND_RATE", 14))
+STAVE_EMAIL_MIN_SEND_RATE = 1.0
+STAVE_EMAIL_SEND_RATE_RECOVERY = 0.1
+# The most Messages the outbox worker sends from each priority lane per run.
+STAVE_EMAIL_LANE_BUDGETS = {"TRANSACTIONAL": 200, "NORMAL": 200, "BULK": 500}
+# Lower-priority lanes are sent in chunks of this many Messages, with the
+# transactional lane drained again between chunks.
+STAVE_EMAIL_LANE_CHUNK_SIZE = 100
+# Send Messages from the same template as provider batch sends (SES
+# SendBulkEmail) of up to STAVE_EMAIL_BATCH_SIZE recipients. This requires a
+# provider template named STAVE_EMAIL_BATCH_TEMPLATE_ID whose subject, text and
+# HTML parts are "{{subject}}", "{{text}}" and "{{{html}}}".
+STAVE_EMAIL_BATCH_SEND = bool(os.environ.get("STAVE_EMAIL_BATCH_SEND"))
+STAVE_EMAIL_BATCH_SIZE = 50
+STAVE_EMAIL_BATCH_TEMPLATE_ID = os.environ.get(
+    "STAVE_EMAIL_BATCH_TEMPLATE_ID", "stave-message"
+)
+# Due reminders are locked and sent in chunks of this many items.
+STAVE_REMINDER_CHUNK_SIZE = 100
 
 # Markdownify settings
 MARKDOWNIFY = {
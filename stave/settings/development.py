@@ -31,7 +31,7 @@ INTERNAL_IPS = [
 
 # Development email backend - Use console backend for local development
 if not os.environ.get("EMAIL_BACKEND"):  # pragma: no cover
-    EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+    STAVE_EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 # Allow verbose error pages
 DEBUG_PROPAGATE_EXCEPTIONS = True
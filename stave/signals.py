@@ -0,0 +1,169 @@
+import dataclasses
+import uuid
+from functools import partial
+from weakref import WeakKeyDictionary
+
+from anymail.signals import AnymailTrackingEvent, tracking
+from django.apps import apps as global_apps
+from django.db import connections, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_migrate
+from django.dispatch import receiver
+
+from . import effective_assignments, models
+
+SUPPRESSING_EVENTS = {
+    "bounced": models.EmailSuppressionReason.BOUNCE,
+    "complained": models.EmailSuppressionReason.COMPLAINT,
+}
+
+
+@receiver(tracking)
+def suppress_from_tracking_event(
+    sender, event: AnymailTrackingEvent, esp_name: str, **kwargs
+):
+    # Hard bounces and spam complaints arrive from the provider's webhook.
+    # (Soft bounces are reported as "deferred" and are left alone.)
+    if (reason := SUPPRESSING_EVENTS.get(event.event_type)) and event.recipient:
+        models.EmailSuppression.objects.get_or_create(
+            email=event.recipient.lower(), defaults={"reason": reason}
+        )
+
+
+@receiver(post_save, sender=models.Application)
+def count_saved_application(
+    sender, instance: models.Application, created: bool, update_fields, **kwargs
+):
+    if update_fields is not None and "status" not in update_fields:
+        return  # The saved status is unchanged.
+
+    counts = models.ApplicationStatusCount.objects
+    previous = getattr(instance, "saved_status", None)
+    if created:
+        counts.adjust(instance.form_id, instance.status, 1)
+    elif previous is None:
+        # It wasn't in the database to read its status from.
+        counts.refresh([instance.form_id])
+    elif previous != instance.status:
+        counts.adjust(instance.form_id, previous, -1)
+        counts.adjust(instance.form_id, instance.status, 1)
+
+    instance.saved_status = instance.status
+
+
+@receiver(post_delete, sender=models.Application)
+def count_deleted_application(sender, instance: models.Application, **kwargs):
+    status = getattr(instance, "saved_status", None)
+    models.ApplicationStatusCount.objects.filter(
+        form_id=instance.form_id,
+        status=instance.status if status is None else status,
+    ).update(count=F("count") - 1)
+
+
+@receiver(pre_migrate)
+def drop_effective_assignments(sender, using: str, **kwargs):
+    if sender.name == "stave":
+        effective_assignments.drop_view(connections[using])
+
+
+@receiver(post_migrate)
+def create_effective_assignments(sender, using: str, apps=global_apps, **kwargs):
+    # flush also sends post_migrate, without the migrated apps.
+    if sender.name != "stave":
+        return
+
+    try:
+        apps.get_model("stave", "EffectiveAssignment")
+    except LookupError:
+        return  # Migrated back to before the view existed.
+
+    effective_assignments.create_view(connections[using])
+
+
+@dataclasses.dataclass
+class CrewChanges:
+    """What a transaction's crew changes touched, for re-recording the
+    GameHistory of complete Events once it commits."""
+
+    crew_ids: set[uuid.UUID] = dataclasses.field(default_factory=set)
+    game_ids: set[uuid.UUID] = dataclasses.field(default_factory=set)
+    event_ids: set[uuid.UUID] = dataclasses.field(default_factory=set)
+
+
+# Per connection, as connections are per thread.
+pending_crew_changes: WeakKeyDictionary[BaseDatabaseWrapper, CrewChanges] = (
+    WeakKeyDictionary()
+)
+
+
+def crew_changes(using: str) -> CrewChanges:
+    connection = connections[using]
+    changes = pending_crew_changes.setdefault(connection, CrewChanges())
+    # Scheduled with every change rather than once: a rolled back transaction
+    # discards its callbacks but not pending_crew_changes. The first callback to
+    # run records everything, and the rest find nothing left to do.
+    transaction.on_commit(partial(record_crew_changes, connection), using=using)
+    return changes
+
+
+def record_crew_changes(connection: BaseDatabaseWrapper):
+    if (changes := pending_crew_changes.pop(connection, None)) is None:
+        return
+
+    # Only those still complete: a later save in the transaction may have
+    # reopened one, which deleted its histories.
+    event_ids = list(
+        models.Event.objects.using(connection.alias)
+        .filter(
+            Q(id__in=changes.event_ids)
+            | Q(
+                id__in=models.Crew.objects.filter(id__in=changes.crew_ids).values(
+                    "event_id"
+                )
+            )
+            | Q(
+                id__in=models.Game.objects.filter(id__in=changes.game_ids).values(
+                    "event_id"
+                )
+            ),
+            status=models.EventStatus.COMPLETE,
+        )
+        .values_list("id", flat=True)
+    )
+    if event_ids:
+        models.GameHistory.objects.record(event_ids)
+
+
+# Crew corrections made after an event completes belong in its GameHistory.
+@receiver([post_save, post_delete], sender=models.CrewAssignment)
+def record_crew_assignment_change(
+    sender, instance: models.CrewAssignment, using: str, **kwargs
+):
+    crew_changes(using).crew_ids.add(instance.crew_id)
+
+
+@receiver([post_save, post_delete], sender=models.RoleGroupCrewAssignment)
+def record_role_group_crew_assignment_change(
+    sender, instance: models.RoleGroupCrewAssignment, using: str, **kwargs
+):
+    crew_changes(using).game_ids.add(instance.game_id)
+
+
+@receiver(post_delete, sender=models.Crew)
+def record_crew_deletion(sender, instance: models.Crew, using: str, **kwargs):
+    # Games that used the Crew lose it without a RoleGroupCrewAssignment save.
+    crew_changes(using).event_ids.add(instance.event_id)
+
+
+@receiver(post_save, sender=models.Event)
+def record_game_histories(sender, instance: models.Event, created: bool, **kwargs):
+    # Bulk completion in jobs.update_event_statuses records its own histories.
+    previous = getattr(instance, "saved_status", None)
+    if instance.status == models.EventStatus.COMPLETE:
+        models.GameHistory.objects.record([instance])
+    elif previous == models.EventStatus.COMPLETE or (previous is None and not created):
+        # No longer complete, or loaded without its status so it might have been.
+        models.GameHistory.objects.filter(game__event=instance).delete()
+
+    instance.saved_status = instance.status
@@ -165,6 +165,7 @@ class CommCenterInputs:
     pending_invitation: QuerySet[models.Application]
     pending_rejection: QuerySet[models.Application]
     pending_assignment: QuerySet[models.Application]
+    pending_schedule_update: QuerySet[models.User]
     application_form: models.ApplicationForm
     redirect_url: str
 
@@ -81,6 +81,9 @@ def get_legal_state_changes(
 
 @register.filter
 def is_staffed_on_event(user: models.User, event: models.Event) -> bool:
+    # Annotated by EventQuerySet.prefetch_for_cards()
+    if hasattr(event, "is_user_staffed"):
+        return event.is_user_staffed
     if user.is_authenticated:
         return models.User.objects.staffed(event).filter(id=user.id).exists()
 
@@ -90,31 +93,27 @@ def is_staffed_on_event(user: models.User, event: models.Event) -> bool:
 @register.filter
 def can_manage_league(user: models.User, league: models.League) -> bool:
     if user.is_authenticated:
-        return models.LeagueUserPermission.objects.filter(
-            user=user, league=league, permission=models.UserPermission.LEAGUE_MANAGER
-        ).exists()
+        return user.has_league_permission(
+            league.id, models.UserPermission.LEAGUE_MANAGER
+        )
     return False
 
 
 @register.filter
 def can_manage_league_events(user: models.User, league: models.League) -> bool:
     if user.is_authenticated:
-        return models.LeagueUserPermission.objects.filter(
-            user=user,
-            league=league,
-            permission=models.UserPermission.EVENT_MANAGER,
-        ).exists()
+        return user.has_league_permission(
+            league.id, models.UserPermission.EVENT_MANAGER
+        )
     return False
 
 
 @register.filter
 def can_manage_event(user: models.User, event: models.Event) -> bool:
     if user.is_authenticated:
-        return models.LeagueUserPermission.objects.filter(
-            user=user,
-            league=event.league,
-            permission=models.UserPermission.EVENT_MANAGER,
-        ).exists()
+        return user.has_league_permission(
+            event.league_id, models.UserPermission.EVENT_MANAGER
+        )
     return False
 
 
@@ -124,16 +123,14 @@ def is_subscribed_to_league(user: models.User, league: models.League | dict) ->
     # We need to call this from a context where we have a combination
     # of Leagues and League Groups, so the values are just objects
     # with an "id" key, not models.
+    if not user.is_authenticated:
+        return False
     if isinstance(league, models.League):
         id = league.id
     else:
         id = league["id"]
 
-    return (
-        models.LeagueGroup.get_subscriptions_group_for_user(user)
-        .group_memberships.filter(league_id=id)
-        .exists()
-    )
+    return id in user.subscribed_league_ids
 
 
 @register.filter
@@ -144,17 +141,22 @@ def is_subscribed_to_league_group(
     # We need to call this from a context where we have a combination
     # of Leagues and League Groups, so the values are just objects
     # with an "id" key, not models.
+    if not user.is_authenticated:
+        return False
     if isinstance(league_group, models.LeagueGroup):
         id = league_group.id
     else:
         id = league_group["id"]
-    return models.LeagueGroup.objects.subscribed(user).filter(id=id).exists()
+    return id in user.subscribed_league_group_ids
 
 
 @register.filter
 def listed_application_forms(
     user: models.User, event: models.Event
-) -> QuerySet[models.ApplicationForm]:
+) -> QuerySet[models.ApplicationForm] | list[models.ApplicationForm]:
+    # Prefetched by EventQuerySet.prefetch_for_cards()
+    if hasattr(event, "listed_forms"):
+        return event.listed_forms
     return (
         models.ApplicationForm.objects.listed(user)
         .filter(event=event)
@@ -187,11 +189,6 @@ def commalist(d: Sequence[Any]) -> str:
         return ", ".join(str(a) for a in ds[:-1]) + " and " + str(ds[-1])
 
 
-@register.filter
-def game_history(ca: models.CrewAssignment):
-    return models.GameHistory(ca)
-
-
 @register.filter
 def unique_role_names(
     crews: QuerySet[models.CrewAssignment], role_groups: QuerySet[models.RoleGroup]
@@ -280,6 +280,11 @@ urlpatterns = [
         views.FormApplicationsCSVView.as_view(),
         name="form-applications-csv",
     ),
+    path(
+        "_/<slug:league_slug>/events/<slug:event_slug>/forms/<slug:application_form_slug>/applications/<int:from_status>/<int:to_status>/",
+        views.FormApplicationsStatusView.as_view(),
+        name="form-applications-status",
+    ),
     path(
         "_/<slug:league_slug>/events/<slug:event_slug>/forms/<slug:application_form_slug>/comms/",
         views.CommCenterView.as_view(),
@@ -402,3 +407,9 @@ if "debug_toolbar" in settings.INSTALLED_APPS:
     from debug_toolbar.toolbar import debug_toolbar_urls
 
     urlpatterns += debug_toolbar_urls()
+
+# Provider tracking webhooks (bounces and complaints), e.g.
+# /anymail/amazon_ses/tracking/. Without a shared secret, anyone could post
+# fake bounces and suppress any address, so they're only served with one.
+if "WEBHOOK_SECRET" in settings.ANYMAIL:  # pragma: no cover
+    urlpatterns += [path("anymail/", include("anymail.urls"))]
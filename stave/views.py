@@ -13,7 +13,7 @@ from django.core.paginator import Paginator
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
-from django.db.models import Q, QuerySet, Value
+from django.db.models import QuerySet, Value
 from django.http import (
     FileResponse,
     Http404,
@@ -23,6 +23,7 @@ from django.http import (
     HttpResponseForbidden,
     HttpResponseNotFound,
     HttpResponseRedirect,
+    StreamingHttpResponse,
 )
 from django.shortcuts import get_object_or_404, render
 from django.template.defaultfilters import slugify
@@ -38,7 +39,7 @@ import allauth
 from stave.templates.stave import contexts
 
 from . import forms, models, settings
-from .avail import AvailabilityManager, ScheduleManager
+from .avail import AvailabilityManager, ScheduleManager, current_schedules
 
 if TYPE_CHECKING:
     from _typeshed import DataclassInstance
@@ -136,14 +137,10 @@ class OpenApplicationsListView(generic.ListView):
         context = super().get_context_data(*args, **kwargs)
 
         if self.request.user.is_authenticated:
-            subscr_group = models.LeagueGroup.get_subscriptions_group_for_user(
-                self.request.user
+            context["has_subscriptions"] = bool(
+                self.request.user.subscribed_league_ids
+                or self.request.user.subscribed_league_group_ids
             )
-            context["has_subscriptions"] = (
-                subscr_group and subscr_group.group_memberships.exists()
-            ) or models.LeagueGroup.objects.subscribed(self.request.user).exclude(
-                is_subscriptions_group=True
-            ).exists()
         else:
             context["has_subscriptions"] = False
 
@@ -204,58 +201,21 @@ class OfficiatingHistoryView(LoginRequiredMixin, generic.ListView):
     """
     A view that displays a user's officiating history.
 
-    The QuerySet fetches all RoleGroupCrewAssignments with a crew that has the user in a crew
-    assignment. `get_context_data` then computes the effective crew for each of those and bulids a
-    list of GameHistory's. This requires only a single query, and a bit of filtering in memory.
-
-    The QuerySet can be paginated, although the number of game histories shown on the results could
-    be less than the size of the page because the effective crew may not include the user, and could
-    even theoretically be empty. This could be fixed by having get_queryset return GameHistory's,
-    but it's not clear if that can be composed as a QuerySet.
+    Histories are recorded as each event completes (see `GameHistoryQuerySet.record`),
+    so each page is read in a single query, newest game first.
     """
 
     template_name = "stave/officiating_history.html"
-    model = models.RoleGroupCrewAssignment
+    model = models.GameHistory
+    context_object_name = "histories"
+    paginate_by = 25
 
     def get_queryset(self):
-        cas = models.CrewAssignment.objects.filter(user=self.request.user)
-        crews = models.Crew.objects.filter(
-            assignments__in=cas, event__status=models.EventStatus.COMPLETE
-        )
-        rgcas = models.RoleGroupCrewAssignment.objects.filter(
-            Q(crew__in=crews) | Q(crew_overrides__in=crews)
-        ).order_by("-game__start_time")
-        return rgcas
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-
-        histories = []
-        for rgca in context["object_list"]:
-            cas = [ca for ca in rgca.effective_crew() if ca.user == self.request.user]
-            # A user can have up to two roles in a game. Primary role is the one with
-            # `nonexclusive=True`.
-            if len(cas) == 0:
-                continue
-            elif len(cas) == 1:
-                role = cas[0].role
-                secondary_role = None
-            else:
-                role = next((ca.role for ca in cas if ca.role.nonexclusive), None)
-                assert role is not None
-                secondary_role = next(
-                    (ca.role for ca in cas if not ca.role.nonexclusive), None
-                )
-            history = models.GameHistory(
-                game=rgca.game,
-                user=self.request.user,
-                role=role,
-                secondary_role=secondary_role,
-            )
-            histories.append(history)
-        context["histories"] = histories
-
-        return context
+        return (
+            models.GameHistory.objects.filter(user=self.request.user)
+            .prefetch_for_display()
+            .order_by("-game__start_time", "id")
+        )
 
 
 class HomeView(TypedContextMixin[contexts.HomeInputs], generic.TemplateView):
@@ -275,13 +235,9 @@ class HomeView(TypedContextMixin[contexts.HomeInputs], generic.TemplateView):
         if self.request.user.is_authenticated:
             league_queryset = models.League.objects.manageable(self.request.user)
             league_group_queryset = models.LeagueGroup.objects.owned(self.request.user)
-            subscribed_leagues = models.LeagueGroup.get_subscriptions_group_for_user(
-                self.request.user
-            ).group_memberships.count()
-            subscribed_league_groups = (
-                models.LeagueGroup.objects.subscribed(self.request.user)
-                .exclude(is_subscriptions_group=True)
-                .count()
+            subscribed_leagues = len(self.request.user.subscribed_league_ids)
+            subscribed_league_groups = len(
+                self.request.user.subscribed_league_group_ids
             )
 
         return contexts.HomeInputs(
@@ -346,6 +302,7 @@ class EventDetailView(
             models.Event.objects.filter(league__slug=self.kwargs["league"])
             .visible(user=self.request.user)
             .prefetch_for_display()
+            .prefetch_for_cards(self.request.user)
         )
 
 
@@ -494,9 +451,10 @@ class LeagueGroupDetailView(
     def get_context(self) -> contexts.LeagueGroupInputs:
         return contexts.LeagueGroupInputs(
             events=Paginator(
-                models.Event.objects.listed(self.request.user).in_league_group(
-                    self.object
-                ),
+                models.Event.objects.listed(self.request.user)
+                .in_league_group(self.object)
+                .prefetch_for_display()
+                .prefetch_for_cards(self.request.user),
                 10,
             ).get_page(self.request.GET.get("page"))
         )
@@ -592,7 +550,8 @@ class LeagueUnsubscribeView(LoginRequiredMixin, views.View):
             models.League.objects.visible(request.user), slug=league_slug
         )
         models.LeagueGroupMember.objects.filter(
-            group=models.LeagueGroup.get_subscriptions_group_for_user(request.user),
+            group__owner=request.user,
+            group__is_subscriptions_group=True,
             league=league,
         ).delete()
 
@@ -1360,8 +1319,8 @@ class LeagueDetailView(
         return contexts.LeagueDetailViewInputs(
             events=self.get_object()
             .events.listed(self.request.user)
-            .select_related("league")
-            .prefetch_related("games", "application_forms__role_groups")
+            .prefetch_for_display()
+            .prefetch_for_cards(self.request.user)
         )
 
 
@@ -1381,13 +1340,7 @@ class MySubscriptionsView(LoginRequiredMixin, generic.ListView):
 
     def get_queryset(self) -> QuerySet[models.League | models.LeagueGroup]:
         return (
-            models.League.objects.filter(
-                id__in=models.LeagueGroup.get_subscriptions_group_for_user(
-                    self.request.user
-                )
-                .group_memberships.all()
-                .values("league_id")
-            )
+            models.League.objects.filter(id__in=self.request.user.subscribed_league_ids)
             .values("id", "name", "slug")
             .order_by()
             .annotate(kind=Value("league"))
@@ -1409,9 +1362,8 @@ class EventListView(generic.ListView):
     def get_queryset(self) -> QuerySet[models.Event]:
         return (
             models.Event.objects.listed(self.request.user)
-            .prefetch_related("games")
-            .prefetch_related("application_forms")
-            .select_related("league")
+            .prefetch_for_display()
+            .prefetch_for_cards(self.request.user)
         )
 
 
@@ -1626,17 +1578,30 @@ class FormApplicationsView(
         )
 
 
+class Echo:
+    """A file-like object that returns what's written to it, so csv.writer
+    can produce rows for a StreamingHttpResponse."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
 class FormApplicationsCSVView(LoginRequiredMixin, views.View):
+    # Applications are read in keyset-ordered chunks of this size, each with
+    # its own prefetches, so memory use doesn't grow with the form.
+    chunk_size = 500
+
     def get(
         self,
         request: HttpRequest,
         league_slug: str,
         event_slug: str,
         application_form_slug: str,
-    ) -> HttpResponse:
+    ) -> StreamingHttpResponse:
         form: models.ApplicationForm = get_object_or_404(
             models.ApplicationForm.objects.manageable(request.user)
-            .prefetch_applications()
+            .select_related("event", "event__league")
+            .prefetch_related("role_groups", "form_questions")
             .filter(
                 event__slug=event_slug,
                 event__league__slug=league_slug,
@@ -1644,41 +1609,68 @@ class FormApplicationsCSVView(LoginRequiredMixin, views.View):
             slug=application_form_slug,
         )
 
-        response = HttpResponse(
+        return StreamingHttpResponse(
+            self.get_rows(form),
             content_type="text/csv",
             headers={"Content-Disposition": 'attachment; filename="applications.csv"'},
         )
 
-        am = AvailabilityManager.with_application_form(form)
+    def get_applications(self, form: models.ApplicationForm):
+        applications = (
+            form.applications.select_related("user")
+            .prefetch_related("roles", "availability_by_game", "responses")
+            .order_by("id")
+        )
+        last_id = None
+        while True:
+            chunk = applications
+            if last_id:
+                chunk = chunk.filter(id__gt=last_id)
+            chunk = list(chunk[: self.chunk_size])
+            yield from chunk
+
+            if len(chunk) < self.chunk_size:
+                return
+            last_id = chunk[-1].id
+
+    def get_rows(self, form: models.ApplicationForm):
+        am = AvailabilityManager.with_application_form(
+            form, prefetch_applications=False
+        )
+        writer = csv.writer(Echo())
+        role_groups = list(form.role_groups.all())
+        questions = list(form.form_questions.all())
 
-        writer = csv.writer(response)
         # Headers, mirroring application_table_row.html
         requires_profile_fields = form.requires_profile_fields
         if "email" not in requires_profile_fields:
-            requires_profile_fields.insert(0, "email")
-        headers = (
+            requires_profile_fields = ["email"] + requires_profile_fields
+        yield writer.writerow(
             ["Status", "Games"]
             + requires_profile_fields
-            + [rg.name for rg in form.role_groups.all()]
+            + [rg.name for rg in role_groups]
             + ["Availability"]
-            + [q.content for q in form.form_questions.all()]
+            + [q.content for q in questions]
         )
-        writer.writerow(headers)
-        for application in form.applications.all():
-            writer.writerow(
+
+        for application in self.get_applications(form):
+            responses_by_question = application.responses_by_question()
+            yield writer.writerow(
                 [
                     application.get_status_display(),
-                    str(am.game_counts_by_user.get(application.user_id, 0)),
+                    str(am.get_game_count_for_user(application.user)),
                 ]
                 + [
-                    application.get_user_data().get(field)
+                    getattr(application.user, field)
                     for field in requires_profile_fields
                 ]
                 + [
                     ", ".join(
-                        r.name for r in application.roles.all() if r.role_group == rg
+                        r.name
+                        for r in application.roles.all()
+                        if r.role_group_id == rg.id
                     )
-                    for rg in application.form.role_groups.all()
+                    for rg in role_groups
                 ]
                 + [
                     ", ".join(application.availability_by_day)
@@ -1691,14 +1683,9 @@ class FormApplicationsCSVView(LoginRequiredMixin, views.View):
                         ]
                     )
                 ]
-                + [
-                    application.responses_by_question().get(q.id)
-                    for q in form.form_questions.all()
-                ]
+                + [responses_by_question.get(q.id) for q in questions]
             )
 
-        return response
-
 
 class ApplicationStatusView(LoginRequiredMixin, views.View):
     def post(
@@ -1748,6 +1735,42 @@ class ApplicationStatusView(LoginRequiredMixin, views.View):
         return HttpResponseRedirect("/")
 
 
+class FormApplicationsStatusView(LoginRequiredMixin, views.View):
+    """Moves every Application to a form in one status to another, e.g. marking
+    all remaining open Applications for rejection."""
+
+    def post(
+        self,
+        request: HttpRequest,
+        league_slug: str,
+        event_slug: str,
+        application_form_slug: str,
+        from_status: models.ApplicationStatus,
+        to_status: models.ApplicationStatus,
+    ) -> HttpResponse:
+        form: models.ApplicationForm = get_object_or_404(
+            models.ApplicationForm.objects.manageable(request.user),
+            slug=application_form_slug,
+            event__slug=event_slug,
+            event__league__slug=league_slug,
+        )
+
+        changed = form.applications.filter(status=from_status).transition(
+            request.user, to_status
+        )
+        messages.info(
+            request,
+            gettext("Updated {count} applications.").format(count=len(changed)),
+        )
+
+        return HttpResponseRedirect(
+            reverse(
+                "form-applications",
+                args=[league_slug, event_slug, application_form_slug],
+            )
+        )
+
+
 class SetGameCrewView(LoginRequiredMixin, views.View):
     def post(
         self,
@@ -2314,22 +2337,8 @@ class ApplicationFormView(views.View):
 
             app = form.save()
             # Send the user an acknowledgement email.
-            context = models.MergeContext(
-                app, app_form, app_form.event, app_form.event.league, request.user, None
-            )
-            emails.send_message(
-                app,
-                None,
-                None,
-                gettext("Your application to {event.name}"),
-                gettext(
-                    "We received your application to [{event.name}]({event.link}). "
-                    "You can manage your [application]({application.link}) on Stave. "
-                    "You'll receive an email when the {event.name} organizers update "
-                    "your application.\n\n"
-                    "Please don't reply to this message. It is not monitored.\n\n"
-                    "Thank you for your application!"
-                ),
+            emails.send_builtin_message(
+                app, models.BuiltinMessageTemplate.APPLICATION_RECEIVED
             )
 
             return HttpResponseRedirect(reverse("view-application", args=[app.id]))
@@ -2372,6 +2381,9 @@ class CommCenterView(LoginRequiredMixin, views.View):
         pending_assignment = application_form.applications.filter(
             status=models.ApplicationStatus.ASSIGNMENT_PENDING
         )
+        pending_schedule_update = application_form.get_user_queryset_for_context_type(
+            models.SendEmailContextType.SCHEDULE_UPDATE
+        )
 
         return render(
             request,
@@ -2381,6 +2393,7 @@ class CommCenterView(LoginRequiredMixin, views.View):
                     pending_invitation=pending_invitation,
                     pending_rejection=pending_rejection,
                     pending_assignment=pending_assignment,
+                    pending_schedule_update=pending_schedule_update,
                     application_form=application_form,
                     redirect_url=request.GET.get("redirect_url"),
                 )
@@ -2408,8 +2421,14 @@ class CommCenterView(LoginRequiredMixin, views.View):
         except ValueError:
             return HttpResponseBadRequest(f"invalid email_type {email_type}")
 
+        # Selecting schedule update recipients and writing their emails both
+        # need the event's schedule, so it's built once for both.
+        schedules = None
+        if email_type == models.SendEmailContextType.SCHEDULE_UPDATE:
+            schedules = current_schedules(application_form)
+
         member_queryset = application_form.get_user_queryset_for_context_type(
-            email_type
+            email_type, schedules
         )
 
         # A specific user was intended as the target
@@ -2420,17 +2439,21 @@ class CommCenterView(LoginRequiredMixin, views.View):
             messages.error(request, gettext_lazy("No recipients were selected"))
             return HttpResponseRedirect(request.path)
 
-        from . import emails
+        if message_template := application_form.get_template_for_context_type(
+            email_type
+        ):
+            from . import emails
 
-        for member in member_queryset:
-            # TODO: bulkify
-            application = (
-                application_form.applications.filter(user=member)
-                .exclude(status=models.ApplicationStatus.WITHDRAWN)
-                .first()
-            )
-            emails.send_message_from_messagetemplate(
-                application, request.user, email_type, request.user.email
+            emails.send_bulk_messages(
+                application_form,
+                request.user,
+                email_type,
+                message_template.subject,
+                message_template.content,
+                member_queryset,
+                request.user.email,
+                template=message_template,
+                schedules=schedules,
             )
 
         messages.info(request, gettext_lazy("Your emails are being sent"))
@@ -2561,9 +2584,13 @@ class SendEmailView(LoginRequiredMixin, views.View):
         except ValueError:
             return HttpResponseBadRequest(f"invalid email_type {email_type}")
 
+        schedules = None
+        if email_type == models.SendEmailContextType.SCHEDULE_UPDATE:
+            schedules = current_schedules(application_form)
+
         email_form = forms.SendEmailForm(data=request.POST)
         email_recipients_form = forms.SendEmailRecipientsForm(
-            application_form.get_user_queryset_for_context_type(email_type),
+            application_form.get_user_queryset_for_context_type(email_type, schedules),
             data=request.POST,
         )
 
@@ -2572,29 +2599,23 @@ class SendEmailView(LoginRequiredMixin, views.View):
             content: str = email_form.cleaned_data["content"]
             subject: str = email_form.cleaned_data["subject"]
             reply_to: str = email_form.cleaned_data.get("reply_to", "").strip()
-            with transaction.atomic():
-                from . import emails  # avoid circular import
-
-                recipients = email_recipients_form.cleaned_data["recipients"]
-                if not recipients:
-                    messages.error(request, gettext_lazy("No recipients were selected"))
-                for user in recipients:
-                    application = (
-                        application_form.applications.filter(user=user)
-                        .exclude(status=models.ApplicationStatus.WITHDRAWN)
-                        .first()
-                    )
-                    emails.send_message(
-                        application,
-                        request.user,
-                        email_type,
-                        subject,
-                        content,
-                        reply_to,
-                    )
+            from . import emails  # avoid circular import
 
-                if recipients:
-                    messages.info(request, gettext_lazy("Your emails are being sent"))
+            recipients = email_recipients_form.cleaned_data["recipients"]
+            if not recipients:
+                messages.error(request, gettext_lazy("No recipients were selected"))
+            else:
+                emails.send_bulk_messages(
+                    application_form,
+                    request.user,
+                    email_type,
+                    subject,
+                    content,
+                    recipients,
+                    reply_to,
+                    schedules=schedules,
+                )
+                messages.info(request, gettext_lazy("Your emails are being sent"))
             redirect_url = request.POST.get("redirect_url")
             if redirect_url and url_has_allowed_host_and_scheme(
                 redirect_url, settings.ALLOWED_HOSTS
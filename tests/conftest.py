@@ -1,6 +1,7 @@
 from pytest_factoryboy import register
 
 from datetime import datetime, date, time
+import django.db
 from django.contrib.auth.models import AnonymousUser
 
 import zoneinfo
@@ -31,6 +32,22 @@ def _zeal():
         yield
 
 
+@pytest.fixture(autouse=True)
+def _keep_test_connection(monkeypatch):
+    # Jobs close stale connections around each run. Inside a test's
+    # transaction, PostgreSQL connections count as stale and would be closed.
+    monkeypatch.setattr(django.db, "close_old_connections", lambda **kwargs: None)
+
+
+@pytest.fixture(autouse=True)
+def _email_delivery_backend(settings):
+    # pytest-django swaps EMAIL_BACKEND for locmem; do the same for the
+    # backend the outbox worker delivers through.
+    settings.STAVE_EMAIL_DELIVERY_BACKEND = (
+        "django.core.mail.backends.locmem.EmailBackend"
+    )
+
+
 @pytest.fixture
 def enabled_league(db, league_factory):
     return league_factory(enabled=True)
@@ -0,0 +1,825 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+from anymail.exceptions import AnymailAPIError
+from anymail.message import AnymailMessage
+from anymail.signals import AnymailTrackingEvent, tracking
+from django.core import mail
+from django.db import connection
+from django.utils import translation
+
+from stave import emails, jobs, mail as stave_mail, models, partitions
+from tests.factories import ApplicationFactory, CrewFactory, RoleFactory
+
+pytestmark = pytest.mark.django_db
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="partitioning is PostgreSQL-specific"
+)
+
+
+def test_send_bulk_messages__rejection(tournament, event_manager_user, user_factory):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    role_group = form.role_groups.first()
+    crew = CrewFactory(
+        event=tournament, role_group=role_group, kind=models.CrewKind.EVENT_CREW
+    )
+    rejected = [
+        ApplicationFactory(form=form, status=models.ApplicationStatus.REJECTION_PENDING)
+        for _ in range(3)
+    ]
+    untouched = ApplicationFactory(form=form, status=models.ApplicationStatus.APPLIED)
+    models.CrewAssignment.objects.create(
+        crew=crew, user=rejected[0].user, role=role_group.roles.first()
+    )
+
+    count = emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        models.SendEmailContextType.REJECTION,
+        "Sorry, {user.preferred_name}",
+        "Thanks for applying to {event.name}.",
+        form.get_user_queryset_for_context_type(models.SendEmailContextType.REJECTION),
+    )
+
+    assert count == 3
+    messages = models.Message.objects.all()
+    assert {m.user_id for m in messages} == {a.user_id for a in rejected}
+    for message in messages:
+        assert message.subject == f"Sorry, {message.user.preferred_name}"
+        assert tournament.name in message.content_plain_text
+        assert message.reply_to == event_manager_user.email
+    assert all(
+        status == models.ApplicationStatus.REJECTED
+        for status in form.applications.filter(
+            id__in=[a.id for a in rejected]
+        ).values_list("status", flat=True)
+    )
+    untouched.refresh_from_db()
+    assert untouched.status == models.ApplicationStatus.APPLIED
+    assert not models.CrewAssignment.objects.filter(crew=crew).exists()
+
+
+def test_send_bulk_messages__skips_withdrawn(tournament, event_manager_user):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    application = ApplicationFactory(
+        form=form, status=models.ApplicationStatus.WITHDRAWN
+    )
+
+    count = emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        None,
+        "Subject",
+        "Content",
+        models.User.objects.filter(id=application.user_id),
+    )
+
+    assert count == 0
+    assert not models.Message.objects.exists()
+
+
+def test_merge_template__segments():
+    template = emails.compile_template("Hi {user.preferred_name}, {bogus} {}")
+
+    assert template.fields == ["user.preferred_name", "bogus"]
+    assert (
+        template.render({"user.preferred_name": "Amos", "bogus": None})
+        == "Hi Amos, {bogus} {}"
+    )
+
+
+def test_merge_value_resolver__matches_merge_context(tournament, user_factory):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    fields = [
+        f"{entity}.{attr}"
+        for entity, attrs in models.MergeContext.LEGAL_MERGE_FIELDS.items()
+        for attr in attrs
+    ]
+    sender = user_factory()
+    resolver = emails.MergeValueResolver(fields)
+
+    for _ in range(2):
+        application = ApplicationFactory(form=form)
+        context = models.MergeContext(
+            league=tournament.league,
+            event=tournament,
+            app_form=form,
+            application=application,
+            user=application.user,
+            sender=sender,
+        )
+
+        assert resolver.resolve(context) == {
+            field: context.get_merge_field_value(field) for field in fields
+        }
+
+
+def test_html_merge_template__escapes_values():
+    template = emails.compile_html_template(
+        "Hi *{user.preferred_name}*, see [your schedule]({app_form.schedule_link})"
+        " or {application.link}."
+    )
+
+    assert template.segments is not None
+    assert template.render(
+        {
+            "user.preferred_name": "<b>Naomi</b>",
+            "app_form.schedule_link": "https://stave.app/s?a=1&b=2",
+            "application.link": "https://example.com/application/1/",
+        }
+    ) == (
+        "<p>Hi <em>&lt;b&gt;Naomi&lt;/b&gt;</em>, see "
+        '<a href="https://stave.app/s?a=1&amp;b=2">your schedule</a> or '
+        '<a href="https://example.com/application/1/">'
+        "https://example.com/application/1/</a>.</p>"
+    )
+
+
+def test_html_merge_template__matches_markdownify():
+    content = (
+        "Welcome to {event.name}!\n\n[Apply here]({app_form.link})" + emails.FOOTER_MD
+    )
+    values = {"event.name": "Ceres Open", "app_form.link": "https://stave.app/f/"}
+
+    assert emails.compile_html_template(content).render(values) == emails.render_html(
+        emails.compile_template(content).render(values)
+    )
+
+
+def test_html_merge_template__falls_back_for_unsafe_urls():
+    template = emails.compile_html_template("[Click]({league.website})")
+    values = {"league.website": "javascript:alert(1)"}
+
+    assert "javascript" not in template.render(values)
+    assert template.render(values) == emails.render_html(
+        emails.compile_template("[Click]({league.website})").render(values)
+    )
+
+
+def test_html_merge_template__renders_markdown_fields():
+    template = emails.compile_html_template("Hello!\n\n{app_form.intro_text}")
+    values = {"app_form.intro_text": "Our **best** event:\n\n* Games\n* Parties"}
+
+    assert template.segments is None
+    assert "<strong>best</strong>" in template.render(values)
+    assert template.render(values) == emails.render_html(
+        emails.compile_template("Hello!\n\n{app_form.intro_text}").render(values)
+    )
+
+
+def test_send_builtin_message__deferred(tournament, mailoutbox, settings):
+    settings.STAVE_EMAIL_DEFER_RENDERING = True
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    application = ApplicationFactory(form=form)
+
+    emails.send_builtin_message(
+        application, models.BuiltinMessageTemplate.APPLICATION_RECEIVED
+    )
+
+    message = models.Message.objects.get()
+    assert message.deferred
+    assert message.content_html == ""
+
+    jobs.send_emails()
+
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].subject == f"Your application to {tournament.name}"
+    assert mailoutbox[0].to == [application.user.email]
+    assert application.get_absolute_url() in mailoutbox[0].body
+    assert application.get_absolute_url() in mailoutbox[0].alternatives[0][0]
+
+    message.refresh_from_db()
+    assert message.sent
+    assert message.content_html == ""
+
+
+def test_send_bulk_messages__deferred(
+    tournament, event_manager_user, mailoutbox, settings
+):
+    settings.STAVE_EMAIL_DEFER_RENDERING = True
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    template = form.invitation_email_template
+    template.subject = "Welcome, {user.preferred_name}"
+    template.save()
+    applications = [
+        ApplicationFactory(
+            form=form, status=models.ApplicationStatus.INVITATION_PENDING
+        )
+        for _ in range(3)
+    ]
+
+    emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        models.SendEmailContextType.INVITATION,
+        template.subject,
+        template.content,
+        form.get_user_queryset_for_context_type(models.SendEmailContextType.INVITATION),
+        template=template,
+    )
+
+    assert (
+        models.Message.objects.filter(template=template, content_html="").count() == 3
+    )
+    assert (
+        form.applications.filter(status=models.ApplicationStatus.INVITED).count() == 3
+    )
+
+    jobs.send_emails()
+
+    assert sorted(m.subject for m in mailoutbox) == sorted(
+        f"Welcome, {a.user.preferred_name}" for a in applications
+    )
+    assert all(m.reply_to == [event_manager_user.email] for m in mailoutbox)
+
+
+@pytest.fixture
+def anymail_test_backend(settings):
+    settings.STAVE_EMAIL_DELIVERY_BACKEND = "anymail.backends.test.EmailBackend"
+    mail.outbox = []
+    return mail.outbox
+
+
+def test_send_emails__batch_send(
+    tournament, event_manager_user, anymail_test_backend, settings
+):
+    settings.STAVE_EMAIL_DEFER_RENDERING = True
+    settings.STAVE_EMAIL_BATCH_SEND = True
+    settings.STAVE_EMAIL_BATCH_SIZE = 2
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    template = form.rejection_email_template
+    applications = [
+        ApplicationFactory(form=form, status=models.ApplicationStatus.REJECTION_PENDING)
+        for _ in range(3)
+    ]
+    emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        models.SendEmailContextType.REJECTION,
+        template.subject,
+        template.content,
+        form.get_user_queryset_for_context_type(models.SendEmailContextType.REJECTION),
+        template=template,
+    )
+
+    jobs.send_emails()
+
+    assert len(anymail_test_backend) == 2
+    params = [email.anymail_test_params for email in anymail_test_backend]
+    assert all(p["is_batch_send"] for p in params)
+    assert all(
+        p["template_id"] == settings.STAVE_EMAIL_BATCH_TEMPLATE_ID for p in params
+    )
+    merge_data = params[0]["merge_data"] | params[1]["merge_data"]
+    assert set(merge_data) == {a.user.email for a in applications}
+    assert all(
+        data["html"] and data["text"] and data["subject"]
+        for data in merge_data.values()
+    )
+    assert models.Message.objects.filter(sent=True).count() == 3
+
+
+def test_send_emails__batch_send_failure(
+    tournament, event_manager_user, anymail_test_backend, settings
+):
+    settings.STAVE_EMAIL_DEFER_RENDERING = True
+    settings.STAVE_EMAIL_BATCH_SEND = True
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    template = form.invitation_email_template
+    for _ in range(2):
+        ApplicationFactory(
+            form=form, status=models.ApplicationStatus.INVITATION_PENDING
+        )
+    emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        models.SendEmailContextType.INVITATION,
+        template.subject,
+        template.content,
+        form.get_user_queryset_for_context_type(models.SendEmailContextType.INVITATION),
+        template=template,
+    )
+
+    with mock.patch.object(
+        AnymailMessage, "anymail_test_response", AnymailAPIError("down"), create=True
+    ):
+        jobs.send_emails()
+
+    assert len(anymail_test_backend) == 1
+    assert list(models.Message.objects.values_list("sent", "tries")) == [
+        (False, 1),
+        (False, 1),
+    ]
+
+
+def test_send_emails__priority_lanes(user_factory, mailoutbox, settings):
+    settings.STAVE_EMAIL_LANE_BUDGETS = {"TRANSACTIONAL": 10, "NORMAL": 10, "BULK": 2}
+    for i in range(3):
+        emails.send_message_with_content(
+            f"Bulk {i}",
+            "Content",
+            user_factory(),
+            priority=models.MessagePriority.BULK,
+        )
+    emails.send_message_with_content("Normal", "Content", user_factory())
+    emails.send_message_with_content(
+        "Transactional",
+        "Content",
+        user_factory(),
+        priority=models.MessagePriority.TRANSACTIONAL,
+    )
+
+    jobs.send_emails()
+
+    assert [m.subject for m in mailoutbox] == [
+        "Transactional",
+        "Normal",
+        "Bulk 0",
+        "Bulk 1",
+    ]
+    assert models.Message.objects.get(sent=False).subject == "Bulk 2"
+
+
+def test_outbox_email_backend(db, mailoutbox, settings):
+    settings.EMAIL_BACKEND = "stave.mail.OutboxEmailBackend"
+
+    mail.send_mail("Your code", "123456", None, ["naomi@example.com"])
+
+    assert mailoutbox == []
+    message = models.Message.objects.get()
+    assert message.email == "naomi@example.com"
+    assert message.priority == models.MessagePriority.TRANSACTIONAL
+
+    jobs.send_emails()
+
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].subject == "Your code"
+    assert mailoutbox[0].body == "123456"
+    assert mailoutbox[0].alternatives == []
+
+
+def test_outbox_email_backend__attachments_sent_directly(db, mailoutbox, settings):
+    settings.EMAIL_BACKEND = "stave.mail.OutboxEmailBackend"
+    email = mail.EmailMessage("Report", "See attached", to=["amos@example.com"])
+    email.attach("report.csv", "a,b\n", "text/csv")
+
+    email.send()
+
+    assert len(mailoutbox) == 1
+    assert not models.Message.objects.exists()
+
+
+def test_send_rate_limiter__waits_for_tokens(db, settings, monkeypatch):
+    settings.STAVE_EMAIL_SEND_RATE = 10
+    sleeps = []
+    monkeypatch.setattr(stave_mail.time, "sleep", sleeps.append)
+    limiter = stave_mail.SendRateLimiter()
+
+    limiter.acquire(10)
+    assert sleeps == []
+
+    limiter.acquire(5)
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(0.5, abs=0.05)
+
+
+def test_send_rate_limiter__throttled(db, settings, monkeypatch):
+    settings.STAVE_EMAIL_SEND_RATE = 8
+    settings.STAVE_EMAIL_MIN_SEND_RATE = 3
+    monkeypatch.setattr(stave_mail.time, "sleep", lambda _: None)
+    limiter = stave_mail.SendRateLimiter()
+
+    limiter.acquire()
+    limiter.throttled()
+    assert models.SendRateLimit.objects.get().rate == pytest.approx(4, abs=0.01)
+
+    limiter.throttled()
+    assert models.SendRateLimit.objects.get().rate == pytest.approx(3, abs=0.01)
+
+
+def test_send_emails__throttling_does_not_use_tries(
+    user_factory, anymail_test_backend, monkeypatch
+):
+    monkeypatch.setattr(stave_mail.time, "sleep", lambda _: None)
+    emails.send_message_with_content("Subject", "Content", user_factory())
+
+    with mock.patch.object(
+        mail.EmailMultiAlternatives,
+        "anymail_test_response",
+        AnymailAPIError("TooManyRequestsException: Maximum sending rate exceeded."),
+        create=True,
+    ):
+        jobs.send_emails()
+
+    message = models.Message.objects.get()
+    assert not message.sent
+    assert message.tries == 0
+    assert models.SendRateLimit.objects.get().rate < 14
+
+
+def test_send_emails__digest(user_factory, mailoutbox, settings):
+    settings.STAVE_EMAIL_DIGEST_MINUTES = 30
+    official, other, waiting = user_factory(), user_factory(), user_factory()
+    an_hour_ago = datetime.now(tz=timezone.utc) - timedelta(hours=1)
+    for subject in ["Invitation", "Schedule"]:
+        emails.send_message_with_content(subject, f"{subject} **body**", official)
+    emails.send_message_with_content("Rejection", "Sorry", other)
+    emails.send_message_with_content("Too soon", "Not yet", waiting)
+    models.Message.objects.exclude(user=waiting).update(created_at=an_hour_ago)
+    # Still inside the window, but rides along with the due digest.
+    emails.send_message_with_content("Reminder", "Reminder body", official)
+
+    jobs.send_emails()
+
+    assert len(mailoutbox) == 2
+    digest = next(m for m in mailoutbox if m.to == [official.email])
+    assert digest.subject == "3 updates from Stave"
+    for section in ["Invitation", "Schedule", "Reminder body"]:
+        assert section in digest.body
+    assert digest.body.count("Manage Your Account") == 1
+    assert "<strong>body</strong>" in digest.alternatives[0][0]
+    assert next(m for m in mailoutbox if m.to == [other.email]).subject == "Rejection"
+    assert list(
+        models.Message.objects.filter(sent=False).values_list("subject", flat=True)
+    ) == ["Too soon"]
+
+
+def test_send_emails__digest_per_reply_to(user_factory, mailoutbox, settings):
+    settings.STAVE_EMAIL_DIGEST_MINUTES = 30
+    official = user_factory()
+    for subject, reply_to in [
+        ("Invitation", "ceres@example.com"),
+        ("Schedule", "ceres@example.com"),
+        ("Rejection", "eros@example.com"),
+    ]:
+        emails.send_message_with_content(subject, "Body", official, reply_to=reply_to)
+    models.Message.objects.update(
+        created_at=datetime.now(tz=timezone.utc) - timedelta(hours=1)
+    )
+
+    jobs.send_emails()
+
+    assert sorted((m.reply_to, m.subject) for m in mailoutbox) == [
+        (["ceres@example.com"], "2 updates from Stave"),
+        (["eros@example.com"], "Rejection"),
+    ]
+
+
+def test_build_digest__in_recipients_language(user_factory):
+    official = user_factory()
+    with translation.override("es"):
+        for subject in ["Invitation", "Schedule"]:
+            emails.send_message_with_content(subject, "Body", official)
+    messages = list(models.Message.objects.order_by("created_at"))
+    assert {message.language for message in messages} == {"es"}
+
+    languages = []
+
+    def ngettext(singular, plural, count):
+        languages.append(translation.get_language())
+        return plural
+
+    with mock.patch.object(emails, "ngettext", ngettext):
+        digest = emails.build_digest(messages)
+
+    assert digest.language == "es"
+    assert languages == ["es"]
+
+
+@pytest.mark.parametrize(
+    "event_type,reason",
+    [
+        ("bounced", models.EmailSuppressionReason.BOUNCE),
+        ("complained", models.EmailSuppressionReason.COMPLAINT),
+    ],
+)
+def test_tracking_event__suppresses(db, event_type, reason):
+    tracking.send(
+        sender=None,
+        event=AnymailTrackingEvent(
+            event_type=event_type, recipient="Bobbie@Example.com"
+        ),
+        esp_name="Amazon SES",
+    )
+
+    assert models.EmailSuppression.objects.get().email == "bobbie@example.com"
+    assert models.EmailSuppression.objects.get().reason == reason
+
+
+def test_tracking_event__ignores_deferred(db):
+    tracking.send(
+        sender=None,
+        event=AnymailTrackingEvent(event_type="deferred", recipient="a@example.com"),
+        esp_name="Amazon SES",
+    )
+
+    assert not models.EmailSuppression.objects.exists()
+
+
+def test_tracking_webhook__not_served_without_secret(client, settings):
+    assert "WEBHOOK_SECRET" not in settings.ANYMAIL
+
+    response = client.post("/anymail/amazon_ses/tracking/", {})
+
+    assert response.status_code == 404
+
+
+def test_send_emails__skips_suppressed(user_factory, mailoutbox):
+    bounced, ok = user_factory(email="Gone@Example.com"), user_factory()
+    models.EmailSuppression.objects.create(
+        email=bounced.email, reason=models.EmailSuppressionReason.BOUNCE
+    )
+    emails.send_message_with_content("Subject", "Content", bounced)
+    emails.send_message_with_content("Subject", "Content", ok)
+
+    jobs.send_emails()
+
+    assert [m.to for m in mailoutbox] == [[ok.email]]
+    message = models.Message.objects.get(user=bounced)
+    assert message.suppressed
+    assert not message.sent
+    assert message.tries == 0
+
+
+class WorkerKilled(BaseException):
+    pass
+
+
+def test_send_emails__saves_each_send(user_factory, mailoutbox):
+    first, second = user_factory(), user_factory()
+    emails.send_message_with_content("Subject", "Content", first)
+    emails.send_message_with_content("Subject", "Content", second)
+    build_email = jobs.build_email
+
+    def build_email_then_die(message, connection):
+        if message.user_id == second.id:
+            raise WorkerKilled()
+        return build_email(message, connection)
+
+    with (
+        mock.patch.object(jobs, "build_email", build_email_then_die),
+        pytest.raises(WorkerKilled),
+    ):
+        jobs.send_emails()
+
+    assert [m.to for m in mailoutbox] == [[first.email]]
+    assert models.Message.objects.get(user=first).sent
+    assert not models.Message.objects.get(user=second).sent
+
+
+def test_send_bulk_messages__skips_suppressed(tournament, event_manager_user):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    applications = [
+        ApplicationFactory(
+            form=form, status=models.ApplicationStatus.INVITATION_PENDING
+        )
+        for _ in range(2)
+    ]
+    models.EmailSuppression.objects.create(
+        email=applications[0].user.email,
+        reason=models.EmailSuppressionReason.COMPLAINT,
+    )
+
+    count = emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        models.SendEmailContextType.INVITATION,
+        "Subject",
+        "Content",
+        form.get_user_queryset_for_context_type(models.SendEmailContextType.INVITATION),
+    )
+
+    assert count == 1
+    assert models.Message.objects.get().user == applications[1].user
+    assert (
+        form.applications.filter(status=models.ApplicationStatus.INVITED).count() == 2
+    )
+
+
+def test_partitions__week_start():
+    assert partitions.week_start(
+        datetime(2025, 7, 17, 15, 30, tzinfo=timezone.utc)
+    ) == datetime(2025, 7, 14, tzinfo=timezone.utc)
+    assert (
+        partitions.partition_name(datetime(2025, 7, 14, tzinfo=timezone.utc))
+        == "stave_message_w20250714"
+    )
+
+
+def test_delete_old_messages(user_factory, mailoutbox, caplog, settings):
+    user = user_factory()
+    for subject in ["Old", "Recent", "Pending"]:
+        emails.send_message_with_content(subject, "Content", user)
+    eight_days_ago = datetime.now(tz=timezone.utc) - timedelta(days=8)
+    models.Message.objects.filter(subject__in=["Old", "Pending"]).update(
+        created_at=eight_days_ago
+    )
+    models.Message.objects.filter(subject="Old").update(
+        sent=True, sent_date=eight_days_ago
+    )
+    models.Message.objects.filter(subject="Recent").update(
+        sent=True, sent_date=datetime.now(tz=timezone.utc) - timedelta(days=2)
+    )
+
+    with caplog.at_level(logging.ERROR):
+        jobs.delete_old_messages()
+
+    assert set(models.Message.objects.values_list("subject", flat=True)) == {
+        "Recent",
+        "Pending",
+    }
+    # Too old to retry, so it's failed rather than silently left pending.
+    pending = models.Message.objects.get(subject="Pending")
+    assert not pending.sent
+    assert pending.tries == settings.STAVE_EMAIL_MAX_TRIES
+    assert "Gave up on 1 messages" in caplog.text
+
+
+@postgres_only
+def test_partitions__drop_expired_partitions(user_factory):
+    user = user_factory()
+    week = datetime(2020, 1, 6, tzinfo=timezone.utc)
+    with connection.cursor() as cursor:
+        partitions.create_partition(cursor, week)
+    for subject in ["Sent", "Unsent"]:
+        emails.send_message_with_content(subject, "Content", user)
+    models.Message.objects.update(created_at=week)
+    models.Message.objects.filter(subject="Sent").update(sent=True, sent_date=week)
+
+    assert partitions.drop_expired_partitions(timedelta(days=7)) == []
+    assert list(models.Message.objects.values_list("subject", flat=True)) == ["Unsent"]
+
+    models.Message.objects.update(sent=True, sent_date=week)
+    with connection.cursor() as cursor:
+        # As if committed: a table with pending FK checks can't be dropped.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    assert partitions.drop_expired_partitions(timedelta(days=7)) == [
+        partitions.partition_name(week)
+    ]
+    assert not models.Message.objects.exists()
+
+
+def test_send_emails__ignores_expired_messages(user_factory, mailoutbox):
+    emails.send_message_with_content("Stale", "Content", user_factory())
+    models.Message.objects.update(
+        created_at=datetime.now(tz=timezone.utc) - timedelta(days=8)
+    )
+
+    jobs.send_emails()
+
+    assert mailoutbox == []
+
+
+def test_send_bulk_messages__schedule_update(tournament, event_manager_user):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    role_group = form.role_groups.first()
+    roles = RoleFactory.create_batch(3, role_group=role_group)
+    crew = CrewFactory(
+        event=tournament, role_group=role_group, kind=models.CrewKind.EVENT_CREW
+    )
+    unchanged, moved = [
+        ApplicationFactory(
+            form=form, status=models.ApplicationStatus.ASSIGNMENT_PENDING
+        )
+        for _ in range(2)
+    ]
+    models.CrewAssignment.objects.create(crew=crew, user=unchanged.user, role=roles[0])
+    assignment = models.CrewAssignment.objects.create(
+        crew=crew, user=moved.user, role=roles[1]
+    )
+
+    emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        models.SendEmailContextType.SCHEDULE,
+        "Your schedule",
+        "See {app_form.schedule_link}",
+        form.get_user_queryset_for_context_type(models.SendEmailContextType.SCHEDULE),
+    )
+
+    assert models.ScheduleSnapshot.objects.count() == 2
+    assert not form.get_user_queryset_for_context_type(
+        models.SendEmailContextType.SCHEDULE_UPDATE
+    ).exists()
+
+    assignment.role = roles[2]
+    assignment.save()
+    recipients = form.get_user_queryset_for_context_type(
+        models.SendEmailContextType.SCHEDULE_UPDATE
+    )
+    assert list(recipients) == [moved.user]
+
+    models.Message.objects.all().delete()
+    count = emails.send_bulk_messages(
+        form,
+        event_manager_user,
+        models.SendEmailContextType.SCHEDULE_UPDATE,
+        "Your schedule changed",
+        "See {app_form.schedule_link}",
+        recipients,
+    )
+
+    assert count == 1
+    message = models.Message.objects.get()
+    assert message.user == moved.user
+    assert "Changes to your schedule" in message.content_plain_text
+    assert f"Added:\n\n- {tournament.name}: {roles[2].name}" in (
+        message.content_plain_text
+    )
+    assert f"Removed:\n\n- {tournament.name}: {roles[1].name}" in (
+        message.content_plain_text
+    )
+    assert "<li>" in message.content_html
+    assert message.content_plain_text.rstrip().endswith(
+        emails.render_txt(emails.FOOTER_MD).rstrip()
+    )
+    assert not form.get_user_queryset_for_context_type(
+        models.SendEmailContextType.SCHEDULE_UPDATE
+    ).exists()
+
+
+def test_send_reminder_emails(enabled_league, settings):
+    settings.STAVE_REMINDER_CHUNK_SIZE = 2
+    expiration_date = datetime.now(tz=timezone.utc) + timedelta(days=7)
+    invitations = [
+        models.LeagueUserInvitation.objects.create(
+            email=f"invitee{i}@example.com",
+            league=enabled_league,
+            expiration_date=expiration_date,
+        )
+        for i in range(3)
+    ]
+    declined = models.LeagueUserInvitation.objects.create(
+        email="declined@example.com",
+        league=enabled_league,
+        expiration_date=expiration_date,
+        status=models.LeagueUserInvitationStatus.DECLINED,
+    )
+    assert declined.next_reminder_at is None
+
+    jobs.send_reminder_emails()
+
+    assert sorted(models.Message.objects.values_list("email", flat=True)) == sorted(
+        invitation.email for invitation in invitations
+    )
+    assert all(
+        message.priority == models.MessagePriority.TRANSACTIONAL
+        for message in models.Message.objects.all()
+    )
+    for invitation in invitations:
+        invitation.refresh_from_db()
+        assert invitation.next_reminder_at - invitation.last_date_message_sent == (
+            timedelta(hours=72)
+        )
+
+    # Nothing is due until the interval passes.
+    jobs.send_reminder_emails()
+    assert models.Message.objects.count() == 3
+
+    models.LeagueUserInvitation.objects.filter(id=invitations[0].id).update(
+        next_reminder_at=datetime.now(tz=timezone.utc) - timedelta(minutes=1)
+    )
+    jobs.send_reminder_emails()
+    assert models.Message.objects.filter(email=invitations[0].email).count() == 2
+
+
+def test_notify_subscribers(tournament, user_factory, league_factory):
+    group_subscriber, own_subscriber, both, bystander = [
+        user_factory() for _ in range(4)
+    ]
+    group = models.LeagueGroup.objects.create(
+        name="The Belt", owner=bystander, private=False
+    )
+    models.LeagueGroupMember.objects.create(league=tournament.league, group=group)
+    for user in [group_subscriber, both]:
+        models.LeagueGroupSubscription.objects.create(league_group=group, user=user)
+    for user in [own_subscriber, both]:
+        models.LeagueGroupMember.objects.create(
+            league=tournament.league,
+            group=models.LeagueGroup.get_subscriptions_group_for_user(user),
+        )
+    models.LeagueGroupMember.objects.create(
+        league=league_factory(),
+        group=models.LeagueGroup.get_subscriptions_group_for_user(bystander),
+    )
+
+    jobs.notify_subscribers()
+
+    messages = models.Message.objects.all()
+    assert sorted(m.user_id for m in messages) == sorted(
+        u.id for u in [group_subscriber, own_subscriber, both]
+    )
+    urls = [form.get_absolute_url() for form in tournament.application_forms.all()]
+    for message in messages:
+        assert message.priority == models.MessagePriority.BULK
+        assert message.subject == "2 new application forms are open"
+        assert all(url in message.content_plain_text for url in urls)
+    assert not models.ApplicationForm.objects.filter(
+        subscribers_notified_at__isnull=True
+    ).exists()
+
+    jobs.notify_subscribers()
+    assert models.Message.objects.count() == 3
@@ -1,7 +1,16 @@
+import copy
+
+import pytest
+from django.apps import apps as global_apps
+from django.core.management.sql import emit_post_migrate_signal, emit_pre_migrate_signal
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
 from stave import models
 
 from .factories import (
     ApplicationFactory,
+    CrewFactory,
     EventFactory,
     ApplicationFormFactory,
     GameFactory,
@@ -10,6 +19,8 @@ from .factories import (
     EventTemplateFactory,
     ApplicationFormTemplateFactory,
     ApplicationFormTemplateAssignmentFactory,
+    RoleFactory,
+    UserFactory,
 )
 
 
@@ -68,6 +79,24 @@ def test_league_query_set__visible(
     assert disabled_league not in models.League.objects.visible(anonymous_user)
 
 
+def test_user__has_league_permission(
+    enabled_league, full_privilege_user, league_factory, django_assert_num_queries
+):
+    other_league = league_factory()
+    user = models.User.objects.get(id=full_privilege_user.id)
+
+    with django_assert_num_queries(1):
+        assert user.has_league_permission(
+            enabled_league.id, models.UserPermission.EVENT_MANAGER
+        )
+        assert user.has_league_permission(
+            enabled_league.id, models.UserPermission.LEAGUE_MANAGER
+        )
+        assert not user.has_league_permission(
+            other_league.id, models.UserPermission.EVENT_MANAGER
+        )
+
+
 def test_event_query_set__visible(
     db, event_manager_user, unprivileged_user, anonymous_user
 ):
@@ -135,6 +164,173 @@ def test_event_query_set__manageable(db, event_manager_user, unprivileged_user):
     assert not models.Event.objects.manageable(unprivileged_user)
 
 
+def test_game__head_officials(
+    tournament, role_group_so, role_group_nso, django_assert_num_queries
+):
+    hr_role = RoleFactory(role_group=role_group_so, name="HR")
+    hnso_role = RoleFactory(role_group=role_group_nso, name="HNSO")
+    expected = {}
+    for game in tournament.games.all():
+        users = {}
+        for role_group, role in [(role_group_so, hr_role), (role_group_nso, hnso_role)]:
+            crew = CrewFactory(
+                event=tournament, role_group=role_group, kind=models.CrewKind.GAME_CREW
+            )
+            users[role] = UserFactory()
+            models.CrewAssignment.objects.create(crew=crew, user=users[role], role=role)
+            models.RoleGroupCrewAssignment.objects.filter(
+                game=game, role_group=role_group
+            ).update(crew=crew)
+
+        # The override crew's HNSO replaces the static crew's.
+        override = CrewFactory(
+            event=tournament,
+            role_group=role_group_nso,
+            kind=models.CrewKind.OVERRIDE_CREW,
+        )
+        hnso = models.CrewAssignment.objects.create(
+            crew=override, user=UserFactory(), role=hnso_role
+        ).user
+        models.RoleGroupCrewAssignment.objects.filter(
+            game=game, role_group=role_group_nso
+        ).update(crew_overrides=override)
+
+        expected[game.id] = models.HeadOfficials(hr=users[hr_role], hnso=hnso)
+
+    # Resolved from the prefetched crews, in a fixed number of queries...
+    with django_assert_num_queries(4):
+        head_officials = {
+            game.id: game.head_officials()
+            for game in tournament.games.prefetch_effective_crews()
+        }
+
+    assert head_officials == expected
+    # ...or else from the effective assignment view.
+    game = tournament.games.first()
+    assert game.hr() == expected[game.id].hr
+    assert game.hnso() == expected[game.id].hnso
+
+
+def test_effective_assignment(tournament, role_group_so):
+    game = tournament.games.first()
+    hr_role, ipr_role = RoleFactory.create_batch(2, role_group=role_group_so)
+    static = CrewFactory(
+        event=tournament, role_group=role_group_so, kind=models.CrewKind.GAME_CREW
+    )
+    override = CrewFactory(
+        event=tournament, role_group=role_group_so, kind=models.CrewKind.OVERRIDE_CREW
+    )
+    static_hr, static_ipr, override_hr = UserFactory.create_batch(3)
+    models.CrewAssignment.objects.create(crew=static, user=static_hr, role=hr_role)
+    models.CrewAssignment.objects.create(crew=static, user=static_ipr, role=ipr_role)
+    models.CrewAssignment.objects.create(crew=override, user=override_hr, role=hr_role)
+    rgca = game.role_group_crew_assignments.get(role_group=role_group_so)
+    rgca.crew = static
+    rgca.save()
+
+    assert set(
+        models.EffectiveAssignment.objects.filter(game=game).values_list(
+            "role_id", "user_id", "is_override"
+        )
+    ) == {(hr_role.id, static_hr.id, False), (ipr_role.id, static_ipr.id, False)}
+
+    rgca.crew_overrides = override
+    rgca.save()
+
+    assert set(
+        models.EffectiveAssignment.objects.filter(game=game).values_list(
+            "role_id", "user_id", "is_override"
+        )
+    ) == {(hr_role.id, override_hr.id, True), (ipr_role.id, static_ipr.id, False)}
+    assert {ca.user_id for ca in rgca.effective_crew()} == set(
+        models.EffectiveAssignment.objects.filter(
+            role_group_crew_assignment=rgca
+        ).values_list("user_id", flat=True)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_effective_assignment__crew_tables_alterable_by_migrations():
+    # Views pin the columns they read; migrations must not trip over it.
+    user = models.CrewAssignment._meta.get_field("user")
+    nullable_user = copy.copy(user)
+    nullable_user.null = True
+
+    for old, new in [(user, nullable_user), (nullable_user, user)]:
+        emit_pre_migrate_signal(verbosity=0, interactive=False, db="default")
+        with connection.schema_editor() as schema_editor:
+            schema_editor.alter_field(models.CrewAssignment, old, new)
+        emit_post_migrate_signal(
+            verbosity=0, interactive=False, db="default", apps=global_apps
+        )
+
+    assert not models.EffectiveAssignment.objects.exists()
+
+
+def test_game_history__record(
+    tournament, role_group_so, django_capture_on_commit_callbacks
+):
+    game = tournament.games.first()
+    hr_role = RoleFactory(role_group=role_group_so, name="HR", nonexclusive=True)
+    alt_role = RoleFactory(role_group=role_group_so, name="ALT")
+    crew = CrewFactory(
+        event=tournament, role_group=role_group_so, kind=models.CrewKind.GAME_CREW
+    )
+    hr = UserFactory()
+    models.CrewAssignment.objects.create(crew=crew, user=hr, role=hr_role)
+    models.CrewAssignment.objects.create(crew=crew, user=hr, role=alt_role)
+    models.RoleGroupCrewAssignment.objects.filter(
+        game=game, role_group=role_group_so
+    ).update(crew=crew)
+
+    tournament.status = models.EventStatus.COMPLETE
+    tournament.save()
+
+    history = models.GameHistory.objects.get(user=hr)
+    assert (history.game_id, history.role_id, history.secondary_role_id) == (
+        game.id,
+        hr_role.id,
+        alt_role.id,
+    )
+    assert history.head_referee_id == hr.id
+
+    # Crew corrections after completion are recorded once they're committed.
+    alt = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        with CaptureQueriesContext(connection) as queries:
+            models.CrewAssignment.objects.filter(crew=crew, role=alt_role).delete()
+            models.CrewAssignment.objects.create(crew=crew, user=alt, role=alt_role)
+        # The changes themselves don't look up their Event.
+        assert not any(
+            "stave_event" in query["sql"] for query in queries.captured_queries
+        )
+    assert models.GameHistory.objects.get(user=hr).secondary_role_id is None
+    assert models.GameHistory.objects.get(user=alt).role_id == alt_role.id
+
+    # A rolled back correction isn't recorded, and doesn't hold up the next.
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(IntegrityError), transaction.atomic():
+            models.CrewAssignment.objects.filter(crew=crew, role=alt_role).delete()
+            models.CrewAssignment.objects.create(crew=crew, user=hr, role=hr_role)
+    assert models.GameHistory.objects.get(user=alt).role_id == alt_role.id
+    with django_capture_on_commit_callbacks(execute=True):
+        models.CrewAssignment.objects.filter(crew=crew, role=alt_role).delete()
+    assert not models.GameHistory.objects.filter(user=alt).exists()
+
+    tournament.status = models.EventStatus.IN_PROGRESS
+    tournament.save()
+
+    assert not models.GameHistory.objects.filter(game__event=tournament).exists()
+
+    # Saving an Event that wasn't complete leaves histories alone.
+    tournament = models.Event.objects.get(id=tournament.id)
+    with CaptureQueriesContext(connection) as queries:
+        tournament.save()
+    assert not any(
+        query["sql"].startswith("DELETE") for query in queries.captured_queries
+    )
+
+
 def test_game_query_set__manageable(db, event_manager_user, unprivileged_user):
     open_event = GameFactory(
         event__league=event_manager_user.league_permissions.first().league,
@@ -214,6 +410,45 @@ def test_application_form_query_set__listed(
     )
 
 
+def test_application_form_query_set__permission_scopes_do_not_join_grants(
+    db, event_manager_user
+):
+    drafting_form = ApplicationFormFactory(
+        event__league=event_manager_user.league_permissions.first().league,
+        event__status=models.EventStatus.DRAFTING,
+    )
+
+    for queryset in [
+        models.ApplicationForm.objects.listed(event_manager_user),
+        models.ApplicationForm.objects.accessible(event_manager_user),
+        models.ApplicationForm.objects.submittable(event_manager_user),
+    ]:
+        sql = str(queryset.query)
+        assert "DISTINCT" not in sql
+        assert "EXISTS" in sql
+        assert list(queryset) == [drafting_form]
+
+
+def test_manageable_query_sets__match_each_row_once(
+    db, event_manager_user, full_privilege_user
+):
+    # Both users hold grants on the same League.
+    league = event_manager_user.league_permissions.first().league
+    form = ApplicationFormFactory(event__league=league)
+
+    for user in [event_manager_user, full_privilege_user]:
+        for queryset, expected in [
+            (models.ApplicationForm.objects.manageable(user), [form]),
+            (models.Event.objects.manageable(user), [form.event]),
+            (models.League.objects.event_manageable(user), [league]),
+        ]:
+            assert "DISTINCT" not in str(queryset.query)
+            assert list(queryset) == expected
+
+    assert list(models.League.objects.manageable(full_privilege_user)) == [league]
+    assert not models.League.objects.manageable(event_manager_user).exists()
+
+
 def test_application_form_query_set__accessible(
     db, event_manager_user, unprivileged_user, anonymous_user
 ):
@@ -411,6 +646,162 @@ def test_application_query_set__pending(db):
     assert closed_application not in models.Application.objects.pending()
 
 
+def test_application_status_count__maintained(db):
+    def counts():
+        return dict(
+            models.ApplicationStatusCount.objects.filter(
+                form=form, count__gt=0
+            ).values_list("status", "count")
+        )
+
+    form = ApplicationFormFactory()
+    assert form.editable
+
+    application = ApplicationFactory(form=form)
+    ApplicationFactory(form=form)
+    assert counts() == {models.ApplicationStatus.APPLIED: 2}
+
+    application.status = models.ApplicationStatus.INVITATION_PENDING
+    application.save()
+    application = models.Application.objects.get(id=application.id)
+    application.status = models.ApplicationStatus.ASSIGNMENT_PENDING
+    application.save()
+    assert counts() == {
+        models.ApplicationStatus.APPLIED: 1,
+        models.ApplicationStatus.ASSIGNMENT_PENDING: 1,
+    }
+
+    application.delete()
+    assert counts() == {models.ApplicationStatus.APPLIED: 1}
+
+    models.Application.objects.filter(form=form).update(
+        status=models.ApplicationStatus.REJECTED
+    )
+    models.ApplicationStatusCount.objects.refresh([form.id])
+    assert counts() == {models.ApplicationStatus.REJECTED: 1}
+
+    form = models.ApplicationForm.objects.get(id=form.id)
+    assert not form.editable
+    assert form.open_application_count == 0
+    assert form.count_applications() == 1
+
+
+def test_application_status_count__stale_instances(db):
+    def counts():
+        return dict(
+            models.ApplicationStatusCount.objects.filter(
+                form=form, count__gt=0
+            ).values_list("status", "count")
+        )
+
+    form = ApplicationFormFactory()
+    application = ApplicationFactory(form=form)
+    ApplicationFactory(form=form)
+
+    # Both loaded before either saves, as in two concurrent requests.
+    first = models.Application.objects.get(id=application.id)
+    second = models.Application.objects.get(id=application.id)
+    first.status = models.ApplicationStatus.INVITATION_PENDING
+    first.save()
+    second.status = models.ApplicationStatus.REJECTED
+    second.save()
+    assert counts() == {
+        models.ApplicationStatus.APPLIED: 1,
+        models.ApplicationStatus.REJECTED: 1,
+    }
+
+    # Saving other fields leaves the counts alone.
+    first.status = models.ApplicationStatus.WITHDRAWN
+    first.save(update_fields=["availability_by_day"])
+    assert counts() == {
+        models.ApplicationStatus.APPLIED: 1,
+        models.ApplicationStatus.REJECTED: 1,
+    }
+
+    first.delete()
+    assert counts() == {models.ApplicationStatus.APPLIED: 1}
+
+
+def test_application__get_legal_state_changes__own_form(tournament, event_manager_user):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    application = ApplicationFactory(form=form, user=event_manager_user)
+
+    assert application.get_legal_state_changes(event_manager_user) == [
+        models.ApplicationStatus.WITHDRAWN,
+        models.ApplicationStatus.INVITATION_PENDING,
+        models.ApplicationStatus.INVITED,
+        models.ApplicationStatus.REJECTION_PENDING,
+        models.ApplicationStatus.REJECTED,
+    ]
+
+
+def test_application_query_set__transition(
+    tournament, event_manager_user, unprivileged_user
+):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    role_group = form.role_groups.first()
+    role = role_group.roles.first()
+    crew = CrewFactory(
+        event=tournament, role_group=role_group, kind=models.CrewKind.EVENT_CREW
+    )
+    applied = [ApplicationFactory(form=form) for _ in range(2)]
+    withdrawn = ApplicationFactory(form=form, status=models.ApplicationStatus.WITHDRAWN)
+    models.CrewAssignment.objects.create(crew=crew, user=applied[0].user, role=role)
+
+    assert not form.applications.transition(
+        unprivileged_user, models.ApplicationStatus.REJECTED
+    )
+
+    changed = form.applications.all().transition(
+        event_manager_user, models.ApplicationStatus.REJECTED
+    )
+
+    assert sorted(a.id for a in changed) == sorted(a.id for a in applied)
+    assert set(form.applications.values_list("status", flat=True)) == {
+        models.ApplicationStatus.REJECTED,
+        models.ApplicationStatus.WITHDRAWN,
+    }
+    assert models.Application.objects.get(id=withdrawn.id).status == (
+        models.ApplicationStatus.WITHDRAWN
+    )
+    assert not models.CrewAssignment.objects.filter(crew=crew).exists()
+    assert (
+        models.ApplicationStatusCount.objects.get(
+            form=form, status=models.ApplicationStatus.REJECTED
+        ).count
+        == 2
+    )
+
+
+def test_application_query_set__transition__confirm_assigned(
+    tournament, event_manager_user
+):
+    form = tournament.application_forms.get(slug="apply-nso-so")
+    role_group = form.role_groups.first()
+    role = role_group.roles.first()
+    crew = CrewFactory(
+        event=tournament, role_group=role_group, kind=models.CrewKind.EVENT_CREW
+    )
+    staffed = ApplicationFactory(
+        form=form, status=models.ApplicationStatus.INVITED, roles=[role]
+    )
+    unstaffed = ApplicationFactory(
+        form=form, status=models.ApplicationStatus.INVITED, roles=[role]
+    )
+    models.CrewAssignment.objects.create(crew=crew, user=staffed.user, role=role)
+
+    form.applications.all().transition(
+        event_manager_user, models.ApplicationStatus.CONFIRMED
+    )
+
+    assert models.Application.objects.get(id=staffed.id).status == (
+        models.ApplicationStatus.ASSIGNMENT_PENDING
+    )
+    assert models.Application.objects.get(id=unstaffed.id).status == (
+        models.ApplicationStatus.CONFIRMED
+    )
+
+
 def test_clone_templates(db):
     league_template = LeagueTemplateFactory()
     event_template = EventTemplateFactory(two_day=True, league_template=league_template)
@@ -0,0 +1,69 @@
+"""EXPLAIN checks that the hot querysets can be served by their indexes.
+
+Test tables are nearly empty, so sequential scans are disabled for each query;
+a plan that still falls back to one means no usable index exists."""
+
+import uuid
+
+import pytest
+from django.db import connection
+
+from stave import jobs, models
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="query plans are PostgreSQL-specific"
+)
+
+
+def plan(queryset) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def test_application__by_form_and_status(db):
+    assert "application_form_status_idx" in plan(
+        models.Application.objects.filter(
+            form_id=uuid.uuid4(), status=models.ApplicationStatus.ASSIGNED
+        )
+    )
+
+
+def test_application__by_user_and_status(db):
+    assert "application_user_status_idx" in plan(
+        models.Application.objects.filter(
+            user_id=uuid.uuid4(), status=models.ApplicationStatus.ASSIGNED
+        )
+    )
+
+
+def test_event__by_status_and_date(db):
+    assert "event_status_start_idx" in plan(
+        models.Event.objects.filter(status=models.EventStatus.OPEN).order_by(
+            "start_date"
+        )
+    )
+
+
+def test_crew_assignment__by_user_and_crew(db):
+    assert "crewassignment_user_crew_idx" in plan(
+        models.CrewAssignment.objects.filter(user_id=uuid.uuid4(), crew_id=uuid.uuid4())
+    )
+
+
+def test_message__outbox(db):
+    result = plan(
+        jobs.outbox()
+        .filter(priority=models.MessagePriority.NORMAL)
+        .order_by("created_at")
+    )
+
+    # stave_message is partitioned; each partition's copy of the index is
+    # named after the partition and the indexed columns.
+    assert "message_outbox_idx" in result or "priority_created_at_idx" in result
+
+
+def test_league_user_permission__grant_lookup(db, event_manager_user):
+    assert "unique_grant" in plan(
+        models.League.objects.event_manageable(event_manager_user)
+    )
@@ -1,10 +1,20 @@
 """View tests to detect N+1 queries via django-zeal."""
 
+import csv
+import io
+from unittest import mock
+
 import pytest
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from stave import avail, models, views
 
 from tests.factories import (
     ApplicationFactory,
+    CrewFactory,
+    GameFactory,
     RoleFactory,
     RoleGroupFactory,
 )
@@ -42,6 +52,21 @@ class TestHomeView:
         response = client.get("/")
         assert response.status_code == 200
 
+    def test_does_not_create_subscriptions_group(self, auth_client):
+        for url in ["/", "/open-applications/", "/my-subscriptions/"]:
+            response = auth_client.get(url)
+            assert response.status_code == 200
+        assert not models.LeagueGroup.objects.filter(owner=auth_client.user).exists()
+
+    def test_subscriptions(self, auth_client, tournament):
+        models.LeagueGroupMember.objects.create(
+            league=tournament.league,
+            group=models.LeagueGroup.get_subscriptions_group_for_user(auth_client.user),
+        )
+        response = auth_client.get("/my-subscriptions/")
+        assert response.status_code == 200
+        assert tournament.league.name.encode() in response.content
+
 
 class TestEventDetailView:
     def test_event_detail(self, client, tournament):
@@ -111,6 +136,34 @@ class TestEventListView:
         response = auth_client.get("/events/")
         assert response.status_code == 200
 
+    def test_query_count_is_independent_of_page_size(
+        self,
+        auth_client,
+        enabled_league,
+        event_factory,
+        application_form_factory,
+        django_assert_max_num_queries,
+    ):
+        def add_events(count: int):
+            for _ in range(count):
+                event = event_factory(
+                    league=enabled_league, status=models.EventStatus.OPEN
+                )
+                application_form_factory(event=event, slug=f"form-{event.pk}")
+
+        urls = ["/events/", f"/_/{enabled_league.slug}/"]
+        add_events(2)
+        baseline = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                assert auth_client.get(url).status_code == 200
+            baseline[url] = len(queries.captured_queries)
+
+        add_events(8)
+        for url in urls:
+            with django_assert_max_num_queries(baseline[url]):
+                assert auth_client.get(url).status_code == 200
+
 
 @pytest.mark.usefixtures("enabled_league")
 class TestLeagueListView:
@@ -127,3 +180,221 @@ class TestApplicationFormView:
             f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/"
         )
         assert response.status_code == 200
+
+
+class TestSendEmailView:
+    def test_send_invitations(self, client, tournament, event_manager_user):
+        league = tournament.league
+        form = tournament.application_forms.get(slug="apply-nso-so")
+        applications = [
+            ApplicationFactory(
+                form=form, status=models.ApplicationStatus.INVITATION_PENDING
+            )
+            for _ in range(3)
+        ]
+        client.force_login(event_manager_user)
+        response = client.post(
+            f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/email/invitation/",
+            {
+                "subject": "You're in",
+                "reply_to": event_manager_user.email,
+                "content": "Hello {user.preferred_name}",
+                "recipients": [str(a.user_id) for a in applications],
+            },
+        )
+        assert response.status_code == 302
+        assert models.Message.objects.count() == 3
+        assert (
+            form.applications.filter(status=models.ApplicationStatus.INVITED).count()
+            == 3
+        )
+
+
+class TestCommCenterView:
+    def test_schedule_updates(self, client, tournament, event_manager_user):
+        league = tournament.league
+        form = tournament.application_forms.get(slug="apply-nso-so")
+        application = ApplicationFactory(
+            form=form, status=models.ApplicationStatus.ASSIGNMENT_PENDING
+        )
+        url = f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/comms/"
+        client.force_login(event_manager_user)
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert b"Schedule Updates (1)" in response.content
+
+        response = client.post(url, {"type": "schedule-update"})
+        assert response.status_code == 302
+        assert models.Message.objects.get().user == application.user
+        application.refresh_from_db()
+        assert application.status == models.ApplicationStatus.ASSIGNED
+        assert models.ScheduleSnapshot.objects.filter(application=application).exists()
+
+    def test_schedule_updates__builds_schedule_once(
+        self, client, tournament, event_manager_user
+    ):
+        league = tournament.league
+        form = tournament.application_forms.get(slug="apply-nso-so")
+        ApplicationFactory.create_batch(
+            2, form=form, status=models.ApplicationStatus.ASSIGNMENT_PENDING
+        )
+        url = f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/comms/"
+        client.force_login(event_manager_user)
+
+        current_schedules = mock.Mock(wraps=avail.current_schedules)
+        with (
+            mock.patch.object(avail, "current_schedules", current_schedules),
+            mock.patch.object(views, "current_schedules", current_schedules),
+        ):
+            response = client.post(url, {"type": "schedule-update"})
+
+        assert response.status_code == 302
+        assert models.Message.objects.count() == 2
+        current_schedules.assert_called_once_with(form)
+
+
+class TestOfficiatingHistoryView:
+    def test_lists_recorded_histories(
+        self, client, tournament, role_group_so, unprivileged_user
+    ):
+        role = role_group_so.roles.first()
+        crew = CrewFactory(
+            event=tournament, role_group=role_group_so, kind=models.CrewKind.GAME_CREW
+        )
+        models.CrewAssignment.objects.create(
+            crew=crew, user=unprivileged_user, role=role
+        )
+        games = list(tournament.games.all())
+        models.RoleGroupCrewAssignment.objects.filter(
+            game__in=games, role_group=role_group_so
+        ).update(crew=crew)
+        tournament.status = models.EventStatus.COMPLETE
+        tournament.save()
+        client.force_login(unprivileged_user)
+
+        response = client.get("/officiating-history")
+
+        assert response.status_code == 200
+        assert [history.game for history in response.context["histories"]] == sorted(
+            games, key=lambda game: game.start_time, reverse=True
+        )
+        assert {history.role for history in response.context["histories"]} == {role}
+
+    def test_paginates(self, client, tournament, role_group_so, unprivileged_user):
+        role = role_group_so.roles.first()
+        models.GameHistory.objects.bulk_create(
+            models.GameHistory(
+                user=unprivileged_user,
+                game=GameFactory(event=tournament, order_key=order_key),
+                role_group=role_group_so,
+                role=role,
+            )
+            for order_key in range(100, 101 + views.OfficiatingHistoryView.paginate_by)
+        )
+        client.force_login(unprivileged_user)
+
+        response = client.get("/officiating-history?page=2")
+
+        assert response.status_code == 200
+        assert len(response.context["histories"]) == 1
+        assert response.context["page_obj"].paginator.num_pages == 2
+
+
+class TestFormApplicationsStatusView:
+    def test_rejects_all_open(self, client, tournament, event_manager_user):
+        league = tournament.league
+        form = tournament.application_forms.get(slug="apply-nso-so")
+        applied = [ApplicationFactory(form=form) for _ in range(3)]
+        invited = ApplicationFactory(form=form, status=models.ApplicationStatus.INVITED)
+        client.force_login(event_manager_user)
+
+        response = client.post(
+            f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/applications/"
+            f"{models.ApplicationStatus.APPLIED}/{models.ApplicationStatus.REJECTION_PENDING}/"
+        )
+
+        assert response.status_code == 302
+        assert set(
+            models.Application.objects.filter(
+                id__in=[a.id for a in applied]
+            ).values_list("status", flat=True)
+        ) == {models.ApplicationStatus.REJECTION_PENDING}
+        invited.refresh_from_db()
+        assert invited.status == models.ApplicationStatus.INVITED
+
+    def test_requires_manager(self, client, tournament, unprivileged_user):
+        league = tournament.league
+        form = tournament.application_forms.get(slug="apply-nso-so")
+        application = ApplicationFactory(form=form)
+        client.force_login(unprivileged_user)
+
+        response = client.post(
+            f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/applications/"
+            f"{models.ApplicationStatus.APPLIED}/{models.ApplicationStatus.REJECTION_PENDING}/"
+        )
+
+        assert response.status_code == 404
+        application.refresh_from_db()
+        assert application.status == models.ApplicationStatus.APPLIED
+
+
+class TestFormApplicationsCSVView:
+    def test_streams_all_applications(
+        self, client, tournament, event_manager_user, monkeypatch
+    ):
+        monkeypatch.setattr(views.FormApplicationsCSVView, "chunk_size", 2)
+        league = tournament.league
+        form = tournament.application_forms.get(slug="apply-nso-so")
+        applications = [
+            ApplicationFactory(form=form, status=models.ApplicationStatus.APPLIED)
+            for _ in range(5)
+        ]
+        client.force_login(event_manager_user)
+
+        response = client.get(
+            f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/applications/csv/"
+        )
+
+        assert response.status_code == 200
+        assert response.streaming
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        assert rows[0][:4] == ["Status", "Games", "email", "preferred_name"]
+        assert sorted(row[2] for row in rows[1:]) == sorted(
+            a.user.email for a in applications
+        )
+
+    def test_leaves_requires_profile_fields_unchanged(
+        self, client, tournament, event_manager_user, monkeypatch
+    ):
+        league = tournament.league
+        form = tournament.application_forms.get(slug="apply-nso-so")
+        models.ApplicationForm.objects.filter(id=form.id).update(
+            requires_profile_fields=["preferred_name", "pronouns"]
+        )
+        ApplicationFactory(form=form, status=models.ApplicationStatus.APPLIED)
+        exported_forms = []
+        get_rows = views.FormApplicationsCSVView.get_rows
+
+        def record_form(view, form):
+            exported_forms.append(form)
+            return get_rows(view, form)
+
+        monkeypatch.setattr(views.FormApplicationsCSVView, "get_rows", record_form)
+        client.force_login(event_manager_user)
+
+        response = client.get(
+            f"/_/{league.slug}/events/{tournament.slug}/forms/{form.slug}/applications/csv/"
+        )
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+
+        assert rows[0][:5] == ["Status", "Games", "email", "preferred_name", "pronouns"]
+        # The email column is added to the export only, not to the form.
+        [exported_form] = exported_forms
+        assert exported_form.requires_profile_fields == ["preferred_name", "pronouns"]
+        form.refresh_from_db()
+        assert form.requires_profile_fields == ["preferred_name", "pronouns"]